@@ -5,23 +5,55 @@ no two adjacent digits are the same. The bounds are provided through command-lin
 The main function utilizes the `Counter` class from the `src.counter` module to perform the
 counting and returns the result. The script handles the parsing of command-line arguments for
 the lower and upper bounds of the range.
+
+With the `--batch` flag every range of the test file is counted at once with the vectorized
+`count_valid_batch` instead of one `Counter` instance per range.
+
+With `--lower_path` and `--upper_path` the bounds are digit strings streamed from files,
+so they can have millions of digits; the count is then given modulo `--modulus`.
 """
 
-from typing import Tuple
+from typing import Optional
 from argparse import ArgumentParser
 
+import numpy as np
+
+from src.batch import count_valid_batch
 from src.counter import Counter
-from src.tools import load_data
+from src.digit_dp import MODULUS, count_range_stream, no_adjacent_equal
+from src.tools import iter_digits, load_data
+
+
+def count_streamed(lower_path: str, upper_path: str, modulus: int = MODULUS) -> int:
+    """
+    Counts the valid numbers between two bounds whose digits are streamed from files.
+
+    Args:
+        lower_path (str): Path of the file with the digits of the lower bound.
+        upper_path (str): Path of the file with the digits of the upper bound.
+        modulus (int, optional): The modulus of the count. Defaults to `MODULUS`.
+
+    Returns:
+        int: The number of valid numbers between the bounds, modulo `modulus`.
+    """
+    result = count_range_stream(
+        no_adjacent_equal(), iter_digits(lower_path), iter_digits(upper_path), modulus
+    )
+    print(f"Valid numbers between the streamed bounds (mod {modulus}): {result}")
+    return result
 
 
-def main(test_path: str) -> int:
+def main(test_path: str, batch: bool = False, modulus: Optional[int] = None) -> int:
     """
     Main function to initialize the Counter and calculate the number of valid numbers
     between the specified lower and upper bounds, where no two adjacent digits are the same.
 
     Args:
-        num_range (Tuple[int, int]): A tuple where the first element is the lower bound
-                                      and the second element is the upper bound of the range.
+        test_path (str): Path of the CSV file with one "a,b" range per line.
+        batch (bool, optional): If True, every range is counted at once with
+                                `count_valid_batch`. Defaults to False.
+        modulus (int, optional): The modulus applied to every count. Defaults to None,
+                                 i.e. the exact counts.
 
     Returns:
         int: The total number of valid numbers between the lower and upper bounds.
@@ -31,10 +63,17 @@ def main(test_path: str) -> int:
 
     test_data = load_data(path=test_path)
 
+    if batch:
+        # Count every range at once, without a Counter instance per range
+        lower, upper = np.array(test_data, dtype=np.int64).reshape(-1, 2).T
+        for num_range, result in zip(test_data, count_valid_batch(lower, upper)):
+            print(f"Range: {num_range}, valid numbers between: {result}")
+        return
+
     for idx, num_range in enumerate(test_data):
 
         # Create an instance of the Counter class with the provided range
-        counter = Counter(num_range=num_range, verbose=True)
+        counter = Counter(num_range=num_range, verbose=True, modulus=modulus)
 
         # Call instance to count numbers
         counter()
@@ -47,12 +86,44 @@ if __name__ == "__main__":
     # Initialize the argument parser for command-line arguments
     parser = ArgumentParser(description="Count valid numbers between two bounds.")
 
+    parser.add_argument("--test_path", type=str, help="Path for the test CSV file.")
+
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Count every range of the test file at once with the vectorized counter.",
+    )
+
+    parser.add_argument(
+        "--lower_path", type=str, help="Path of a file with the digits of the lower bound."
+    )
+
+    parser.add_argument(
+        "--upper_path", type=str, help="Path of a file with the digits of the upper bound."
+    )
+
     parser.add_argument(
-        "--test_path", type=str, required=True, help="Path for the test CSV file."
+        "--modulus",
+        type=int,
+        default=None,
+        help=f"Prime modulus of the counts (streamed bounds default to {MODULUS}).",
     )
 
     # Parse the command-line arguments
     args = parser.parse_args()
 
-    # Print the result of counting valid numbers between the lower and upper bounds
-    main(test_path=args.test_path)
+    streamed = args.lower_path is not None or args.upper_path is not None
+    if streamed and (args.lower_path is None or args.upper_path is None):
+        parser.error("--lower_path and --upper_path must be given together")
+    if streamed == (args.test_path is not None):
+        parser.error("Give either --test_path or the streamed bounds")
+
+    if streamed:
+        count_streamed(
+            lower_path=args.lower_path,
+            upper_path=args.upper_path,
+            modulus=args.modulus if args.modulus is not None else MODULUS,
+        )
+    else:
+        # Print the result of counting valid numbers between the lower and upper bounds
+        main(test_path=args.test_path, batch=args.batch, modulus=args.modulus)
@@ -0,0 +1,97 @@
+"""
+This module provides a vectorized way of counting valid numbers, i.e. numbers without two
+equal adjacent digits, for millions of [a, b] ranges at once.
+
+Instead of running the memoized digit DP of `Counter` once per range, the digits of all
+bounds are swept position by position with NumPy. A number with `L` digits has 9 choices
+for its first digit and 9 for every following one, so the counts of all numbers below a
+prefix come from a precomputed table of powers of 9; the only per-query state is whether
+the prefix of the bound itself is still valid.
+"""
+
+import numpy as np
+
+# Bounds are held in int64, so at most 19 digits
+MAX_DIGITS = 19
+
+# Number of ways to fill `r` positions after a fixed digit: 9^r
+POW9 = np.array([9**r for r in range(MAX_DIGITS + 1)], dtype=np.int64)
+
+# Powers of ten of the digit positions, from the most significant one
+POW10 = np.array([10**r for r in range(MAX_DIGITS - 1, -1, -1)], dtype=np.int64)
+
+# Number of valid numbers with fewer than `L` digits (zero included), indexed by `L`
+SHORTER = np.array(
+    [0, 0] + [10 + sum(9**l for l in range(2, L)) for L in range(2, MAX_DIGITS + 1)],
+    dtype=np.int64,
+)
+
+
+def count_valid_upto(bounds: np.ndarray) -> np.ndarray:
+    """
+    Counts the valid numbers in [0, n] for every bound n.
+
+    Args:
+        bounds (np.ndarray): The inclusive upper bounds. A bound of -1 counts nothing.
+
+    Returns:
+        np.ndarray: The int64 count of valid numbers up to each bound.
+    """
+    bounds = np.asarray(bounds, dtype=np.int64)
+    valid = bounds >= 0
+    n = np.where(valid, bounds, 0)
+
+    # Digits of every bound, padded with leading zeros to MAX_DIGITS positions
+    digits = n[None, :] // POW10[:, None] % 10
+    lengths = 1 + (n[None, :] >= POW10[:-1, None]).sum(axis=0)
+    first = MAX_DIGITS - lengths
+
+    # Numbers with fewer digits than the bound are all below it
+    total = SHORTER[lengths]
+
+    alive = np.ones(n.shape, dtype=bool)  # Whether the prefix of the bound is valid so far
+    previous = np.full(n.shape, -1, dtype=np.int64)
+
+    for pos in range(MAX_DIGITS):
+        active = pos >= first
+        d = digits[pos]
+
+        # The leading digit of a multi-digit number cannot be zero
+        low = np.where((pos == first) & (lengths > 1), 1, 0)
+
+        # Digits below the bound digit, except the previous digit of the prefix
+        choices = d - low - ((previous >= low) & (previous < d))
+        total += np.where(active & alive, choices * POW9[MAX_DIGITS - 1 - pos], 0)
+
+        alive &= ~(active & (d == previous))
+        previous = np.where(active, d, previous)
+
+    # The bound itself is counted if its own digits are valid
+    total += alive
+
+    return np.where(valid, total, 0)
+
+
+def count_valid_batch(lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """
+    Counts the valid numbers in every range [a, b], both bounds inclusive.
+
+    Args:
+        lower (np.ndarray): The lower bounds a of the ranges.
+        upper (np.ndarray): The upper bounds b of the ranges.
+
+    Returns:
+        np.ndarray: The int64 count of valid numbers in each range.
+
+    Raises:
+        ValueError: If the bounds have different shapes or a range is not 0 <= a <= b.
+    """
+    lower = np.asarray(lower, dtype=np.int64)
+    upper = np.asarray(upper, dtype=np.int64)
+
+    if lower.shape != upper.shape:
+        raise ValueError("The lower and upper bounds must have the same shape")
+    if np.any(lower < 0) or np.any(lower > upper):
+        raise ValueError("Every range must satisfy 0 <= a <= b")
+
+    return count_valid_upto(upper) - count_valid_upto(lower - 1)
@@ -6,14 +6,46 @@ counted using dynamic programming (digit DP) techniques.
 The class allows counting numbers in a given range [a, b] (both inclusive), where the numbers
 do not have consecutive digits that are the same.
 
-The class works by using a recursive function with memoization to efficiently calculate the valid
-numbers without iterating through each possible number in the range.
+The counting itself is done by the generic digit DP engine of `src.digit_dp`: the rule is
+compiled into a finite automaton (`no_adjacent_equal`), and any other compiled constraint
+can be passed instead. The states that are no longer tight to the bound do not depend on
+it, so they are shared by every call and instance through the LRU cache of `count_loose`;
+only the O(digits) tight path is walked per bound.
+
+The valid numbers of the range can be paged through without enumerating them: `rank` gives
+the index of a number among them and `unrank` the number at an index, both from the same
+count tables. `numbers` lists them lazily, in increasing order, skipping every block of
+numbers whose prefix already breaks the rule.
+
+`aggregates` returns, modulo a prime, the sum of the valid numbers of the range and the
+frequency of each digit per position along with their count.
+
+The counts are exact unless a modulus is given. Bounds too large for Python ints are
+counted with `count_range_stream` instead, which reads their digits from files.
 """
 
-from typing import Tuple, List
+from typing import Iterator, Optional, Tuple, List
 import os
 import time
 
+import numpy as np
+
+from src.digit_dp import (
+    CHUNK_SIZE,
+    MODULUS,
+    Aggregates,
+    DigitAutomaton,
+    aggregate_range,
+    count_loose,
+    count_upto,
+    iter_valid,
+    iter_valid_chunks,
+    no_adjacent_equal,
+    rank,
+    to_digits,
+    unrank,
+)
+
 
 class Counter:
     """
@@ -22,19 +54,35 @@ class Counter:
 
     Attributes:
         num_range (Tuple[int, int]): A tuple representing the lower and upper bounds of the range.
+        automaton (DigitAutomaton): The compiled constraint a valid number has to satisfy.
+        modulus (Optional[int]): The modulus applied to the result, or None for the exact
+                                 count.
     """
 
-    def __init__(self, num_range: Tuple[int, int], verbose: bool) -> None:
+    def __init__(
+        self,
+        num_range: Tuple[int, int],
+        verbose: bool,
+        automaton: Optional[DigitAutomaton] = None,
+        modulus: Optional[int] = None,
+    ) -> None:
         """
         Initializes the Counter object with the specified range of numbers.
 
         Args:
             num_range (Tuple[int, int]): A tuple where the first element is the lower bound
                                          and the second element is the upper bound of the range.
+            automaton (DigitAutomaton, optional): The compiled constraint a valid number has
+                                                  to satisfy. Defaults to no two equal
+                                                  adjacent digits.
+            modulus (int, optional): The modulus applied to the result, e.g. `MODULUS`.
+                                     Defaults to None, i.e. the exact count.
         """
 
         self.num_range = num_range
         self.verbose = verbose
+        self.automaton = automaton if automaton is not None else no_adjacent_equal()
+        self.modulus = modulus
 
         # Log file name based on the current time and number of disks
         start_time = time.strftime("%Y%m%d_%H%M%S")
@@ -51,20 +99,27 @@ class Counter:
         digits are the same. This method is invoked when an instance of Counter is called.
 
         Returns:
-            Any: The count of valid numbers between the lower and upper bounds,
-                 modulo 10^9+7.
+            int: The count of valid numbers between the lower and upper bounds, modulo
+                 `modulus` if one is given.
         """
         # Count valid numbers in the upper bound and subtract those in the lower bound
 
         result = self.count_valid_numbers(bound="upper") - self.count_valid_numbers(
             bound="lower"
         )
+        if self.modulus is not None:
+            result %= self.modulus
 
         self.__log(message=f"Range: {self.num_range}, valid numbers between: {result}")
 
-        return
+        cache_info = count_loose.cache_info()
+        self.__log(
+            message=f"Loose state cache: {cache_info.hits} hits, {cache_info.misses} misses, {cache_info.currsize} states"
+        )
+
+        return result
 
-    def __get_digits(self, bound: str) -> Tuple[List[str], int]:
+    def __get_digits(self, bound: str) -> Tuple[List[int], int]:
         """
         Converts the number at the bound (upper or lower) to a list of digits and returns the
         digits along with their length.
@@ -74,20 +129,21 @@ class Counter:
                          to process.
 
         Returns:
-            Tuple[List[str], int]: A tuple where the first element is a list of digits of the
+            Tuple[List[int], int]: A tuple where the first element is a list of digits of the
                                     bound number, and the second element is the length of the
                                     list of digits.
         """
         # Select the correct bound (lower bound is exclusive, so we subtract 1)
         n = max(0, self.num_range[0] - 1) if bound == "lower" else self.num_range[1]
 
-        # Return the digits and their length
-        return list(map(int, str(n))), len(list(map(int, str(n))))
+        # Return the digits in the base of the automaton and their length
+        digits = to_digits(n, self.automaton.base)
+        return digits, len(digits)
 
     def count_valid_numbers(self, bound: str) -> int:
         """
-        Counts the number of valid numbers up to the specified bound, where no two adjacent
-        digits are the same.
+        Counts the number of valid numbers up to the specified bound, i.e. the numbers
+        accepted by the automaton (by default: no two adjacent digits are the same).
 
         Args:
             bound (str): The bound for which to count valid numbers. It can be "lower" or
@@ -96,51 +152,94 @@ class Counter:
         Returns:
             int: The count of valid numbers up to the specified bound.
         """
-        digits, length = self.__get_digits(
-            bound=bound
-        )  # Get digits of the bound number
-        memo = {}  # Dictionary to store memoized results for dynamic programming
-
-        def recursion(pos: int, last_digit: int, tight: bool) -> int:
-            """
-            A recursive function to calculate the number of valid numbers with the current state
-            of the digit positions.
-
-            Args:
-                pos (int): The current position in the number (starting from 0).
-                last_digit (int): The last digit chosen in the previous position.
-                tight (bool): A flag indicating whether the current number is tight to the bound.
-
-            Returns:
-                int: The number of valid numbers that can be formed from the current position onward.
-            """
-            # Base case: If we've processed all positions, return 1 (valid number)
-            if pos == length:
-                return 1
-
-            # Check if the result is already computed for this state
-            if (pos, last_digit, tight) in memo:
-                return memo[(pos, last_digit, tight)]
-
-            # Determine the limit for the current digit based on whether we're tight to the bound
-            limit = digits[pos] if tight else 9
-
-            result = 0
-            # Try all digits from 0 to limit
-            for d in range(0, limit + 1):
-                # Skip if the digit is the same as the last digit (to avoid adjacent duplicates)
-                if d == last_digit:
-                    continue
-
-                # If we are placing digit d, check if we are still tight (if d == limit)
-                result += recursion(pos + 1, d, tight and (d == limit))
-
-            # Memoize the result for the current state
-            memo[(pos, last_digit, tight)] = result
-            return result
-
-        # Start the recursion from the first position with no last digit and tight bound
-        return recursion(0, -1, True)
+        # The lower bound is exclusive, so nothing lies below a lower bound of zero
+        if bound == "lower" and self.num_range[0] == 0:
+            return 0
+
+        digits, _ = self.__get_digits(bound=bound)  # Get digits of the bound number
+
+        # Walk the tight path of the bound, the loose states come from the shared memo
+        return count_upto(self.automaton, digits)
+
+    def aggregates(self) -> Aggregates:
+        """
+        Computes the count, the sum and the digit histogram of the valid numbers of the
+        range in a single DP pass per bound.
+
+        Returns:
+            Aggregates: The statistics, modulo `modulus` if one is given and modulo
+                        `MODULUS` otherwise; histogram rows start at the units digit.
+        """
+        modulus = self.modulus if self.modulus is not None else MODULUS
+        return aggregate_range(self.automaton, *self.num_range, modulus)
+
+    def rank(self, x: int) -> int:
+        """
+        Counts the valid numbers of the range that are smaller than x, i.e. the index of x
+        among them if it is valid itself.
+
+        Args:
+            x (int): The number to rank, within the range.
+
+        Returns:
+            int: The number of valid numbers in [a, x).
+
+        Raises:
+            ValueError: If x is outside the range.
+        """
+        lower, upper = self.num_range
+        if not lower <= x <= upper:
+            raise ValueError(f"{x} is outside the range {self.num_range}")
+
+        return rank(self.automaton, x) - rank(self.automaton, lower)
+
+    def unrank(self, k: int) -> int:
+        """
+        Finds the k-th valid number of the range, counting from 0 at the lower bound.
+
+        Args:
+            k (int): The 0-based index among the valid numbers of the range.
+
+        Returns:
+            int: The valid number with that index, so that `rank(unrank(k)) == k`.
+
+        Raises:
+            IndexError: If the range has at most k valid numbers.
+        """
+        lower, upper = self.num_range
+        if k < 0:
+            raise IndexError("The index must be non-negative")
+
+        try:
+            number = unrank(self.automaton, rank(self.automaton, lower) + k)
+        except IndexError:
+            number = None
+        if number is None or number > upper:
+            raise IndexError(f"The range {self.num_range} has no valid number at index {k}")
+
+        return number
+
+    def numbers(self) -> Iterator[int]:
+        """
+        Lazily generates the valid numbers of the range in increasing order.
+
+        Yields:
+            int: The valid numbers between the lower and upper bounds.
+        """
+        return iter_valid(self.automaton, *self.num_range)
+
+    def number_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+        """
+        Lazily generates the valid numbers of the range in int64 arrays, for bulk writes.
+
+        Args:
+            chunk_size (int, optional): The number of valid numbers per array. Defaults to
+                                        `CHUNK_SIZE`.
+
+        Yields:
+            np.ndarray: The valid numbers between the lower and upper bounds.
+        """
+        return iter_valid_chunks(self.automaton, *self.num_range, chunk_size)
 
     def __log(self, message: str) -> None:
         """
@@ -0,0 +1,886 @@
+"""
+This module provides a generic digit DP engine that counts numbers whose digits satisfy a
+constraint given as a compiled finite automaton.
+
+A `DigitAutomaton` reads the digits of a number from the most significant one and tells,
+for every state and digit, which state comes next (or -1 if the number can no longer be
+valid). A number is valid if the state reached after its last digit is accepting. Leading
+zeros are never fed to the automaton: the numbers with fewer digits than the bound are
+counted length by length, each starting with a non-zero digit, except the number zero.
+
+The engine is table driven: `count_loose` computes, for every state, the number of
+accepted digit strings of a given length, one row from the previous one. The rows do not
+depend on the bound, so they are kept in an LRU cache shared by every query, and only the
+O(digits) tight path along the bound is walked per query.
+
+The same tables answer rank queries: `rank` tells how many valid numbers are smaller than
+a given one, and `unrank` finds the valid number with a given index by choosing its digits
+greedily, skipping whole blocks of numbers by their completion counts.
+
+`iter_valid` lists the valid numbers of a range in increasing order by walking the digit
+prefixes depth first; a prefix that is dead or has no valid completion is skipped together
+with its whole block of numbers.
+
+`aggregate_range` goes beyond the count: it returns, modulo a prime, the sum of the valid
+numbers of a range and how often each digit occurs at each position, by multiplying the
+number of prefixes reaching every state with the completion counts of the tables.
+
+For bounds too large to be held as Python ints, `count_upto_stream` runs the DP forward
+over a stream of digits instead, keeping one count per state modulo a prime: its time is
+linear in the number of digits and its memory does not depend on it.
+
+The presets compile the usual constraints (no two equal adjacent digits, forbidden
+substrings, digit sum modulo m, limits on monotone runs). They are cached as well, so
+repeated queries with the same constraint pay no compile cost.
+"""
+
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+# Maximal number of table rows kept by the shared memo
+LOOSE_CACHE_SIZE = 4096
+
+# Default modulus of the streaming counts
+MODULUS = 10**9 + 7
+
+# Number of valid numbers per array of `iter_valid_chunks`
+CHUNK_SIZE = 1 << 16
+
+
+class Aggregates(NamedTuple):
+    """
+    Statistics of the valid numbers of a range, modulo a prime.
+
+    Attributes:
+        count (int): The number of valid numbers.
+        total (int): The sum of the valid numbers.
+        histogram (Tuple[Tuple[int, ...], ...]): For every position, from the least
+            significant one, how many valid numbers have each digit there. Numbers
+            shorter than a position do not count at it.
+    """
+
+    count: int
+    total: int
+    histogram: Tuple[Tuple[int, ...], ...]
+
+
+class DigitAutomaton:
+    """
+    A deterministic finite automaton over the digits of a number.
+
+    Automata are compared by identity, which is what the caches of the engine rely on;
+    the presets return the same instance for the same constraint.
+
+    Attributes:
+        base (int): The base of the digits.
+        start (int): The state before the first digit.
+        transitions (Tuple[Tuple[int, ...], ...]): The next state for every state and
+            digit, or -1 if the number can no longer be valid.
+        accepting (Tuple[bool, ...]): Whether a number ending in each state is valid.
+    """
+
+    def __init__(
+        self,
+        transitions: Sequence[Sequence[int]],
+        accepting: Sequence[bool],
+        start: int = 0,
+        base: int = 10,
+    ) -> None:
+        """
+        Initializes the automaton and checks that its tables are consistent.
+
+        Args:
+            transitions (Sequence[Sequence[int]]): The next state for every state and
+                digit, or -1 if the number can no longer be valid.
+            accepting (Sequence[bool]): Whether a number ending in each state is valid.
+            start (int, optional): The state before the first digit. Defaults to 0.
+            base (int, optional): The base of the digits. Defaults to 10.
+
+        Raises:
+            ValueError: If the tables do not describe an automaton over `base` digits.
+        """
+        n_states = len(transitions)
+        if len(accepting) != n_states or not 0 <= start < n_states:
+            raise ValueError("The accepting and start states must match the transitions")
+        for row in transitions:
+            if len(row) != base or not all(-1 <= state < n_states for state in row):
+                raise ValueError(f"Every state needs a transition for each of {base} digits")
+
+        self.base = base
+        self.start = start
+        self.transitions = tuple(tuple(row) for row in transitions)
+        self.accepting = tuple(bool(flag) for flag in accepting)
+
+    def step(self, state: int, digits: Sequence[int]) -> int:
+        """
+        Feeds a sequence of digits to the automaton.
+
+        Args:
+            state (int): The state to start from.
+            digits (Sequence[int]): The digits to feed.
+
+        Returns:
+            int: The state reached, or -1 if the digits can no longer form a valid number.
+        """
+        for d in digits:
+            state = self.transitions[state][d]
+            if state < 0:
+                break
+        return state
+
+
+# Highest row of each automaton's table built so far, from which the next rows are built
+_LOOSE_TOPS: Dict[DigitAutomaton, Tuple[int, Tuple[int, ...]]] = {}
+
+
+@lru_cache(maxsize=LOOSE_CACHE_SIZE)
+def count_loose(automaton: DigitAutomaton, remaining: int) -> Tuple[int, ...]:
+    """
+    Counts, for every state, the accepted digit strings of a given length, i.e. the ways to
+    complete a number that is no longer tight to its bound.
+
+    The rows are shared by every query through an LRU cache; its hits and misses are
+    available through `count_loose.cache_info()`. A missing row is built bottom-up, in a
+    loop from the highest row built so far (or from the empty string if that one is not
+    below it), and every row on the way goes through the cache, so a cold table costs no
+    recursion however many digits are asked for.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        remaining (int): The number of positions left to fill.
+
+    Returns:
+        Tuple[int, ...]: The number of valid completions from each state.
+    """
+    if remaining == 0:
+        return tuple(int(flag) for flag in automaton.accepting)
+
+    top, previous = _LOOSE_TOPS.get(automaton, (remaining, ()))
+    if top >= remaining:
+        top, previous = 0, count_loose(automaton, 0)
+
+    # Each intermediate row is a cache hit, or a miss whose previous row is the top
+    for length in range(top + 1, remaining):
+        _LOOSE_TOPS[automaton] = (length - 1, previous)
+        previous = count_loose(automaton, length)
+
+    counts = tuple(
+        sum(previous[state] for state in row if state >= 0)
+        for row in automaton.transitions
+    )
+    _LOOSE_TOPS[automaton] = (remaining, counts)
+    return counts
+
+
+@lru_cache(maxsize=LOOSE_CACHE_SIZE)
+def count_exact(automaton: DigitAutomaton, length: int) -> int:
+    """
+    Counts the valid numbers with exactly `length` digits (the number zero has one digit).
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        length (int): The number of digits.
+
+    Returns:
+        int: The number of valid numbers with that many digits.
+    """
+    completions = count_loose(automaton, length - 1)
+    first_digits = automaton.transitions[automaton.start][0 if length == 1 else 1 :]
+    return sum(completions[state] for state in first_digits if state >= 0)
+
+
+def to_digits(n: int, base: int = 10) -> List[int]:
+    """
+    Converts a non-negative number to its digits, the most significant one first.
+
+    Args:
+        n (int): The number to convert.
+        base (int, optional): The base of the digits. Defaults to 10.
+
+    Returns:
+        List[int]: The digits of the number.
+    """
+    if base == 10:
+        return list(map(int, str(n)))
+
+    digits = []
+    while True:
+        n, d = divmod(n, base)
+        digits.append(d)
+        if not n:
+            return digits[::-1]
+
+
+def count_upto(automaton: DigitAutomaton, digits: Sequence[int]) -> int:
+    """
+    Counts the valid numbers in [0, n], where n is given by its digits.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        digits (Sequence[int]): The digits of the inclusive bound, the most significant one
+                                first, without leading zeros.
+
+    Returns:
+        int: The number of valid numbers up to the bound.
+    """
+    length = len(digits)
+    transitions = automaton.transitions
+
+    # Numbers with fewer digits are all below the bound
+    total = sum(count_exact(automaton, l) for l in range(1, length))
+
+    # Numbers with as many digits, smaller than the bound from some position on
+    state = automaton.start
+    for pos, bound_digit in enumerate(digits):
+        completions = count_loose(automaton, length - pos - 1)
+        low = 1 if pos == 0 and length > 1 else 0
+
+        for d in range(low, bound_digit):
+            next_state = transitions[state][d]
+            if next_state >= 0:
+                total += completions[next_state]
+
+        # Stay tight to the bound; stop once its own prefix is invalid
+        state = transitions[state][bound_digit]
+        if state < 0:
+            return total
+
+    # The bound itself
+    return total + automaton.accepting[state]
+
+
+def count_range(automaton: DigitAutomaton, lower: int, upper: int) -> int:
+    """
+    Counts the valid numbers in [a, b], both bounds inclusive.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        lower (int): The lower bound a.
+        upper (int): The upper bound b.
+
+    Returns:
+        int: The number of valid numbers in the range.
+
+    Raises:
+        ValueError: If the range does not satisfy 0 <= a <= b.
+    """
+    if not 0 <= lower <= upper:
+        raise ValueError("The range must satisfy 0 <= a <= b")
+
+    result = count_upto(automaton, to_digits(upper, automaton.base))
+    if lower > 0:
+        result -= count_upto(automaton, to_digits(lower - 1, automaton.base))
+    return result
+
+
+def rank(automaton: DigitAutomaton, n: int) -> int:
+    """
+    Counts the valid numbers smaller than n, i.e. the index of n among the valid numbers if
+    it is valid itself.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        n (int): The non-negative number to rank.
+
+    Returns:
+        int: The number of valid numbers in [0, n).
+    """
+    if n == 0:
+        return 0
+    return count_upto(automaton, to_digits(n - 1, automaton.base))
+
+
+def unrank(automaton: DigitAutomaton, index: int) -> int:
+    """
+    Finds the valid number with the given index, so that `rank(unrank(k)) == k`.
+
+    The length of the number is found by skipping whole lengths with `count_exact`, then
+    each digit is the smallest one whose completions still reach the index, so only
+    O(base * digits) table lookups are needed.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        index (int): The 0-based index among the valid numbers in increasing order.
+
+    Returns:
+        int: The valid number with that index.
+
+    Raises:
+        IndexError: If the index is negative or the automaton accepts fewer numbers.
+    """
+    if index < 0:
+        raise IndexError("The index must be non-negative")
+
+    # An automaton that accepts no number of `n_states` to `2 * n_states` digits accepts
+    # no longer numbers either (pumping lemma), so the search for the length ends there
+    n_states = len(automaton.transitions) + 1
+    length = 1
+    while index >= count_exact(automaton, length):
+        index -= count_exact(automaton, length)
+        length += 1
+        if length == 2 * n_states and not any(
+            count_exact(automaton, l) for l in range(n_states, length)
+        ):
+            raise IndexError("The automaton accepts fewer numbers than the index")
+
+    base = automaton.base
+    transitions = automaton.transitions
+    state = automaton.start
+    number = 0
+
+    for pos in range(length):
+        completions = count_loose(automaton, length - pos - 1)
+        low = 1 if pos == 0 and length > 1 else 0
+
+        for d in range(low, base):
+            next_state = transitions[state][d]
+            if next_state < 0:
+                continue
+            if index < completions[next_state]:
+                break
+            index -= completions[next_state]
+
+        number = number * base + d
+        state = next_state
+
+    return number
+
+
+def aggregate_upto(
+    automaton: DigitAutomaton, digits: Sequence[int], modulus: int = MODULUS
+) -> Aggregates:
+    """
+    Computes the statistics of the valid numbers in [0, n], where n is given by its digits.
+
+    The positions are aligned on the right and walked from the most significant one. At
+    each position the DP holds, per state, the number of prefixes already below the bound,
+    numbers with fewer digits included; a digit d at that position is then counted once
+    per prefix and valid completion, read from `count_loose`. The numbers still equal to the
+    prefix of the bound are counted by a backward pass over the bound. This takes
+    O(digits * states * base) steps.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        digits (Sequence[int]): The digits of the inclusive bound, the most significant one
+                                first, without leading zeros.
+        modulus (int, optional): The modulus of the statistics. Defaults to `MODULUS`.
+
+    Returns:
+        Aggregates: The count, sum and digit histogram of the valid numbers.
+    """
+    base = automaton.base
+    transitions = automaton.transitions
+    start = automaton.start
+    length = len(digits)
+
+    # States of the prefixes of the bound
+    tight_states = [start]
+    for d in digits:
+        state = tight_states[-1]
+        tight_states.append(transitions[state][d] if state >= 0 else -1)
+
+    # Valid numbers up to the bound that share its first `pos` digits
+    tight_counts = [0] * (length + 1)
+    final = tight_states[length]
+    tight_counts[length] = int(final >= 0 and automaton.accepting[final])
+    for pos in range(length - 1, -1, -1):
+        count = tight_counts[pos + 1]
+        state = tight_states[pos]
+        if state >= 0:
+            completions = count_loose(automaton, length - pos - 1)
+            low = 1 if pos == 0 and length > 1 else 0
+            for d in range(low, digits[pos]):
+                next_state = transitions[state][d]
+                if next_state >= 0:
+                    count += completions[next_state]
+        tight_counts[pos] = count
+
+    histogram = [[0] * base for _ in range(length)]
+    loose = [0] * len(transitions)
+
+    for pos in range(length):
+        remaining = length - pos - 1
+        completions = count_loose(automaton, remaining)
+        row = histogram[remaining]
+        prefixes = [0] * len(transitions)
+
+        def extend(state: int, digit_range: range, count: int) -> None:
+            # Count the digits of `count` prefixes in `state` and extend them
+            for d in digit_range:
+                next_state = transitions[state][d]
+                if next_state >= 0:
+                    row[d] += count * completions[next_state]
+                    prefixes[next_state] += count
+
+        # Prefixes already below the bound
+        for state, count in enumerate(loose):
+            if count:
+                extend(state, range(base), count)
+
+        # Numbers with fewer digits start here; zero is the only one starting with 0
+        if pos > 0:
+            extend(start, range(0 if remaining == 0 else 1, base), 1)
+
+        # Numbers that leave the prefix of the bound here, or keep following it
+        state = tight_states[pos]
+        if state >= 0:
+            extend(state, range(1 if pos == 0 and length > 1 else 0, digits[pos]), 1)
+            row[digits[pos]] += tight_counts[pos + 1]
+
+        loose = [count % modulus for count in prefixes]
+        histogram[remaining] = [count % modulus for count in row]
+
+    count = sum(histogram[0]) % modulus
+    total = sum(
+        d * pow(base, position, modulus) * row[d]
+        for position, row in enumerate(histogram)
+        for d in range(1, base)
+    )
+    return Aggregates(count, total % modulus, tuple(map(tuple, histogram)))
+
+
+def aggregate_range(
+    automaton: DigitAutomaton, lower: int, upper: int, modulus: int = MODULUS
+) -> Aggregates:
+    """
+    Computes the statistics of the valid numbers in [a, b], both bounds inclusive.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        lower (int): The lower bound a.
+        upper (int): The upper bound b.
+        modulus (int, optional): The modulus of the statistics. Defaults to `MODULUS`.
+
+    Returns:
+        Aggregates: The count, sum and digit histogram of the valid numbers of the range,
+                    with one histogram row per digit of b.
+
+    Raises:
+        ValueError: If the range does not satisfy 0 <= a <= b.
+    """
+    if not 0 <= lower <= upper:
+        raise ValueError("The range must satisfy 0 <= a <= b")
+
+    result = aggregate_upto(automaton, to_digits(upper, automaton.base), modulus)
+    if lower == 0:
+        return result
+
+    below = aggregate_upto(automaton, to_digits(lower - 1, automaton.base), modulus)
+    histogram = tuple(
+        tuple((count - below_count) % modulus for count, below_count in zip(row, below_row))
+        for row, below_row in zip(
+            result.histogram,
+            below.histogram + ((0,) * automaton.base,) * len(result.histogram),
+        )
+    )
+    return Aggregates(
+        (result.count - below.count) % modulus,
+        (result.total - below.total) % modulus,
+        histogram,
+    )
+
+
+def _iter_valid_length(
+    automaton: DigitAutomaton, low: Sequence[int], high: Sequence[int]
+) -> Iterator[int]:
+    """
+    Generates the valid numbers between two bounds with the same number of digits.
+
+    The prefixes are walked depth first with an explicit stack of one digit per position,
+    so the memory is O(digits). A prefix is entered only if its state has completions.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        low (Sequence[int]): The digits of the inclusive lower bound.
+        high (Sequence[int]): The digits of the inclusive upper bound.
+
+    Yields:
+        int: The valid numbers in increasing order.
+    """
+    length = len(low)
+    base = automaton.base
+    transitions = automaton.transitions
+    completions = [count_loose(automaton, length - pos - 1) for pos in range(length)]
+
+    # Per position: state and value of the prefix, whether it still equals the prefix of
+    # each bound, and the next digit to try
+    states = [automaton.start] + [0] * length
+    values = [0] * (length + 1)
+    low_tight = [True] + [False] * length
+    high_tight = [True] + [False] * length
+    digits = [low[0]] + [0] * (length - 1)
+
+    pos = 0
+    while pos >= 0:
+        d = digits[pos]
+        if d > (high[pos] if high_tight[pos] else base - 1):
+            # Every digit at this position is done, backtrack
+            pos -= 1
+            continue
+
+        digits[pos] += 1
+        state = transitions[states[pos]][d]
+        if state < 0 or not completions[pos][state]:
+            continue
+
+        value = values[pos] * base + d
+        if pos == length - 1:
+            yield value
+            continue
+
+        pos += 1
+        states[pos] = state
+        values[pos] = value
+        low_tight[pos] = low_tight[pos - 1] and d == low[pos - 1]
+        high_tight[pos] = high_tight[pos - 1] and d == high[pos - 1]
+        digits[pos] = low[pos] if low_tight[pos] else 0
+
+
+def iter_valid(automaton: DigitAutomaton, lower: int, upper: int) -> Iterator[int]:
+    """
+    Lazily generates the valid numbers in [a, b] in increasing order.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        lower (int): The lower bound a.
+        upper (int): The upper bound b.
+
+    Yields:
+        int: The valid numbers of the range.
+
+    Raises:
+        ValueError: If the range does not satisfy 0 <= a <= b.
+    """
+    if not 0 <= lower <= upper:
+        raise ValueError("The range must satisfy 0 <= a <= b")
+
+    base = automaton.base
+    low = to_digits(lower, base)
+    high = to_digits(upper, base)
+
+    # One walk per number of digits, between the bounds or the extremes of the length
+    for length in range(len(low), len(high) + 1):
+        yield from _iter_valid_length(
+            automaton,
+            low if length == len(low) else [1] + [0] * (length - 1),
+            high if length == len(high) else [base - 1] * length,
+        )
+
+
+def iter_valid_chunks(
+    automaton: DigitAutomaton, lower: int, upper: int, chunk_size: int = CHUNK_SIZE
+) -> Iterator[np.ndarray]:
+    """
+    Lazily generates the valid numbers in [a, b] in int64 arrays, for bulk writes.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        lower (int): The lower bound a.
+        upper (int): The upper bound b, smaller than 2^63.
+        chunk_size (int, optional): The number of valid numbers per array, the last one
+                                    may be shorter. Defaults to `CHUNK_SIZE`.
+
+    Yields:
+        np.ndarray: The valid numbers of the range in increasing order.
+
+    Raises:
+        ValueError: If the range does not satisfy 0 <= a <= b < 2^63.
+    """
+    if upper >= 1 << 63:
+        raise ValueError("The numbers must fit in int64")
+
+    numbers = iter_valid(automaton, lower, upper)
+    while True:
+        chunk = np.fromiter(islice(numbers, chunk_size), dtype=np.int64)
+        if not len(chunk):
+            return
+        yield chunk
+
+
+@lru_cache(maxsize=None)
+def _stream_tables(automaton: DigitAutomaton) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Builds the tables of the forward DP of `count_upto_stream`.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The number of digits leading from each state to each
+            other state, and the number of non-zero first digits leading to each state.
+    """
+    n_states = len(automaton.transitions)
+    edges = np.zeros((n_states, n_states), dtype=np.int64)
+    for state, row in enumerate(automaton.transitions):
+        for next_state in row:
+            if next_state >= 0:
+                edges[state, next_state] += 1
+
+    first = np.zeros(n_states, dtype=np.int64)
+    for next_state in automaton.transitions[automaton.start][1:]:
+        if next_state >= 0:
+            first[next_state] += 1
+
+    return edges, first
+
+
+def count_upto_stream(
+    automaton: DigitAutomaton, digits: Iterable[int], modulus: int = MODULUS
+) -> Tuple[int, bool]:
+    """
+    Counts the valid numbers in [0, n] modulo a prime, reading the digits of n one by one.
+
+    The DP runs forward, without knowing the length of the bound: after each digit it holds,
+    for every state, the number of started prefixes that are already below the prefix of
+    the bound. A number with fewer digits than the bound is a prefix that starts at a later
+    position, always below the bound. Only the state of the bound itself is tracked besides
+    the counts, so the memory does not depend on the number of digits.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        digits (Iterable[int]): The digits of the inclusive bound, the most significant one
+                                first, without leading zeros.
+        modulus (int, optional): The modulus of the count. Defaults to `MODULUS`.
+
+    Returns:
+        Tuple[int, bool]: The number of valid numbers up to the bound modulo `modulus`, and
+                          whether the bound itself is valid.
+
+    Raises:
+        ValueError: If the bound is empty, has leading zeros or a digit out of the base, or
+                    if the modulus is too large for the int64 counts.
+    """
+    base = automaton.base
+    transitions = automaton.transitions
+    edges, first = _stream_tables(automaton)
+    n_states = len(transitions)
+
+    # A count is below the modulus and is added at most `n_states * base` times per digit
+    if not 1 < modulus < (1 << 63) // (base * (n_states + 2)):
+        raise ValueError("The modulus must fit the int64 counts")
+
+    loose = np.zeros(n_states, dtype=np.int64)
+    state = automaton.start
+    length = 0
+
+    # Counts of the digits below the bound digit, from the tight state
+    below = {}
+
+    for length, bound_digit in enumerate(digits, 1):
+        if not 0 <= bound_digit < base:
+            raise ValueError(f"{bound_digit} is not a digit in base {base}")
+        if length == 2 and first_digit == 0:
+            raise ValueError("Bounds cannot have leading zeros")
+
+        if length == 1:
+            first_digit = bound_digit
+        else:
+            # Extend the loose prefixes and start the numbers with fewer digits
+            loose = loose @ edges + first
+
+        if state >= 0:
+            key = (state, bound_digit, length == 1)
+            if key not in below:
+                counts = np.zeros(n_states, dtype=np.int64)
+                for next_state in transitions[state][int(length == 1) : bound_digit]:
+                    if next_state >= 0:
+                        counts[next_state] += 1
+                below[key] = counts
+            loose += below[key]
+            state = transitions[state][bound_digit]
+
+        loose %= modulus
+
+    if length == 0:
+        raise ValueError("The bound has no digits")
+
+    accepting = np.array(automaton.accepting)
+    total = int(loose[accepting].sum())
+    valid = state >= 0 and automaton.accepting[state]
+
+    # The bound itself, and zero, which has no non-zero first digit
+    total += valid
+    if first_digit != 0:
+        zero = transitions[automaton.start][0]
+        total += zero >= 0 and automaton.accepting[zero]
+
+    return total % modulus, valid
+
+
+def count_range_stream(
+    automaton: DigitAutomaton,
+    lower_digits: Iterable[int],
+    upper_digits: Iterable[int],
+    modulus: int = MODULUS,
+) -> int:
+    """
+    Counts the valid numbers in [a, b] modulo a prime, reading the digits of the bounds one
+    by one.
+
+    Decrementing a streamed bound is not possible, so the lower bound is counted inclusively
+    and added back if it is valid itself. The bounds are not compared.
+
+    Args:
+        automaton (DigitAutomaton): The constraint.
+        lower_digits (Iterable[int]): The digits of the lower bound a.
+        upper_digits (Iterable[int]): The digits of the upper bound b.
+        modulus (int, optional): The modulus of the count. Defaults to `MODULUS`.
+
+    Returns:
+        int: The number of valid numbers in the range modulo `modulus`.
+    """
+    upper, _ = count_upto_stream(automaton, upper_digits, modulus)
+    lower, lower_valid = count_upto_stream(automaton, lower_digits, modulus)
+    return (upper - lower + lower_valid) % modulus
+
+
+@lru_cache(maxsize=None)
+def no_adjacent_equal(base: int = 10) -> DigitAutomaton:
+    """
+    Compiles the constraint of `Counter`: no two adjacent digits are the same.
+
+    The state is the last digit; the extra state `base` is the start.
+
+    Args:
+        base (int, optional): The base of the digits. Defaults to 10.
+
+    Returns:
+        DigitAutomaton: The compiled automaton.
+    """
+    transitions = [
+        [-1 if d == last else d for d in range(base)] for last in range(base)
+    ] + [list(range(base))]
+    return DigitAutomaton(transitions, [True] * (base + 1), start=base, base=base)
+
+
+@lru_cache(maxsize=None)
+def forbidden_substrings(patterns: Tuple[str, ...], base: int = 10) -> DigitAutomaton:
+    """
+    Compiles the constraint that none of the patterns occurs in the digits of the number.
+
+    The states are the nodes of the Aho–Corasick trie of the patterns; a transition that
+    completes a pattern leads to the dead state.
+
+    Args:
+        patterns (Tuple[str, ...]): The forbidden digit strings, e.g. ("13", "666").
+        base (int, optional): The base of the digits. Defaults to 10.
+
+    Returns:
+        DigitAutomaton: The compiled automaton.
+
+    Raises:
+        ValueError: If a pattern is empty or contains a character that is not a digit of
+                    the base.
+    """
+    # Trie of the patterns: children, failure links and terminal flags per node
+    children = [[-1] * base]
+    terminal = [False]
+
+    for pattern in patterns:
+        if not pattern:
+            raise ValueError("Forbidden patterns cannot be empty")
+        node = 0
+        for char in pattern:
+            d = int(char, 36)
+            if d >= base:
+                raise ValueError(f"'{char}' is not a digit in base {base}")
+            if children[node][d] < 0:
+                children[node][d] = len(children)
+                children.append([-1] * base)
+                terminal.append(False)
+            node = children[node][d]
+        terminal[node] = True
+
+    # Breadth-first construction of the goto function with failure links
+    transitions = [[0] * base for _ in children]
+    failure = [0] * len(children)
+    queue = []
+    for d in range(base):
+        child = children[0][d]
+        if child >= 0:
+            transitions[0][d] = child
+            queue.append(child)
+
+    for node in queue:
+        terminal[node] = terminal[node] or terminal[failure[node]]
+        for d in range(base):
+            child = children[node][d]
+            if child >= 0:
+                failure[child] = transitions[failure[node]][d]
+                transitions[node][d] = child
+                queue.append(child)
+            else:
+                transitions[node][d] = transitions[failure[node]][d]
+
+    transitions = [
+        [-1 if terminal[target] else target for target in row] for row in transitions
+    ]
+    return DigitAutomaton(transitions, [not flag for flag in terminal], base=base)
+
+
+@lru_cache(maxsize=None)
+def digit_sum_mod(modulus: int, residue: int = 0, base: int = 10) -> DigitAutomaton:
+    """
+    Compiles the constraint that the digit sum is congruent to `residue` modulo `modulus`.
+
+    Args:
+        modulus (int): The modulus m.
+        residue (int, optional): The required residue. Defaults to 0.
+        base (int, optional): The base of the digits. Defaults to 10.
+
+    Returns:
+        DigitAutomaton: The compiled automaton.
+    """
+    transitions = [[(s + d) % modulus for d in range(base)] for s in range(modulus)]
+    accepting = [s == residue % modulus for s in range(modulus)]
+    return DigitAutomaton(transitions, accepting, base=base)
+
+
+@lru_cache(maxsize=None)
+def max_monotone_run(
+    length: int, increasing: bool = True, base: int = 10
+) -> DigitAutomaton:
+    """
+    Compiles the constraint that no run of strictly increasing (or decreasing) adjacent
+    digits is longer than `length` digits.
+
+    The state is the pair (last digit, length of the current run), numbered as
+    `last * length + run - 1`; the extra state `base * length` is the start.
+
+    Args:
+        length (int): The longest allowed run, at least 1.
+        increasing (bool, optional): Limit increasing runs if True, decreasing runs
+                                     otherwise. Defaults to True.
+        base (int, optional): The base of the digits. Defaults to 10.
+
+    Returns:
+        DigitAutomaton: The compiled automaton.
+
+    Raises:
+        ValueError: If `length` is smaller than 1.
+    """
+    if length < 1:
+        raise ValueError("Runs have at least one digit")
+
+    def state(last: int, run: int) -> int:
+        return last * length + run - 1
+
+    transitions = []
+    for last in range(base):
+        for run in range(1, length + 1):
+            row = []
+            for d in range(base):
+                extends = d > last if increasing else d < last
+                if not extends:
+                    row.append(state(d, 1))
+                else:
+                    row.append(state(d, run + 1) if run < length else -1)
+            transitions.append(row)
+    transitions.append([state(d, 1) for d in range(base)])
+
+    return DigitAutomaton(
+        transitions, [True] * len(transitions), start=base * length, base=base
+    )
@@ -1,4 +1,7 @@
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+
+# Number of characters read at once from a streamed bound
+CHUNK_SIZE = 1 << 16
 
 
 def load_data(path: str) -> List[Tuple[int, int]]:
@@ -33,3 +36,33 @@ def load_data(path: str) -> List[Tuple[int, int]]:
         ]
 
     return test_cases
+
+
+def iter_digits(path: str, base: int = 10, chunk_size: int = CHUNK_SIZE) -> Iterator[int]:
+    """
+    Lazily read the digits of a bound stored as a digit string in a file, so that bounds
+    with millions of digits never have to be converted to a Python int.
+
+    Args:
+        path (str): The path to the file containing the digits, the most significant one
+                    first. Whitespace (e.g. line breaks) is ignored.
+        base (int, optional): The base of the digits. Defaults to 10.
+        chunk_size (int, optional): The number of characters read at once. Defaults to
+                                    `CHUNK_SIZE`.
+
+    Yields:
+        int: The digits of the bound.
+
+    Raises:
+        FileNotFoundError: If the file at the given path does not exist.
+        ValueError: If the file contains a character that is not a digit of the base.
+    """
+    with open(path, "r") as file:
+        while chunk := file.read(chunk_size):
+            for char in chunk:
+                if char.isspace():
+                    continue
+                digit = int(char, 36)
+                if digit >= base:
+                    raise ValueError(f"'{char}' is not a digit in base {base}")
+                yield digit
@@ -10,13 +10,49 @@ Usage:
     - Either specify the number of disks (`--n_disks`) or provide a test file (`--test_path`), 
       but not both.
     - The `--verbose` flag controls whether the steps are printed to the console.
+    - The `--log_format` option selects between the full text log and the compact binary
+      move log, which can be decoded later with `replay.py`.
+    - The `--jobs` option generates the moves with a pool of worker processes.
+    - The `--pegs` option solves the puzzle on more than three pegs (Frame–Stewart).
 """
 
 from argparse import ArgumentParser
+from typing import Union
+
+from src.frame_stewart import FrameStewart
 from src.hanoi import Hanoi
+from src.move_cache import MAX_CACHED_DISKS, MoveCache
 from src.tools import load_data
 
 
+def create_solver(n_disks: int, kwargs: dict) -> Union[Hanoi, FrameStewart]:
+    """
+    Create the solver of a single puzzle from the command-line arguments.
+
+    Args:
+        n_disks (int): The number of disks for the puzzle.
+        kwargs (dict): The arguments of `main`.
+
+    Returns:
+        Union[Hanoi, FrameStewart]: A `Hanoi` instance for three pegs, a `FrameStewart`
+                                    instance for more pegs.
+    """
+    if kwargs.get("pegs", 3) > 3:
+        return FrameStewart(
+            n_disks=n_disks,
+            n_pegs=kwargs.get("pegs"),
+            verbose=kwargs.get("verbose"),
+        )
+
+    return Hanoi(
+        n_disks=n_disks,
+        verbose=kwargs.get("verbose"),
+        log_format=kwargs.get("log_format", "text"),
+        jobs=kwargs.get("jobs", 1),
+        move_cache=kwargs.get("move_cache"),
+    )
+
+
 def main(**kwargs):
     """
     Main function that either solves the Towers of Hanoi puzzle for a given number of disks
@@ -33,17 +69,31 @@ def main(**kwargs):
             - test_path (str): Path to the file containing test cases (if `n_disks` is not provided).
             - verbose (bool): Flag to determine if the steps of the puzzle are printed to standard output.
                 Defaults to `True`.
+            - log_format (str): Either "text" or "binary", the format of the move log.
+                Defaults to "text".
+            - jobs (int): The number of worker processes generating the moves. Defaults to 1.
+            - pegs (int): The number of pegs. Defaults to 3.
     """
     if kwargs.get("test_path"):
         # Load test cases from the provided path
         test_cases = load_data(path=kwargs.get("test_path"))
 
+        # Build the sequence of the largest cached case once, the smaller ones are its
+        # prefixes; a single case has nothing to share it with
+        cached = [n_disks for n_disks in test_cases if n_disks <= MAX_CACHED_DISKS]
+        if (
+            kwargs.get("jobs", 1) == 1
+            and kwargs.get("pegs", 3) == 3
+            and len(test_cases) > 1
+            and cached
+        ):
+            move_cache = MoveCache()
+            move_cache.prepare(max(cached))
+            kwargs = dict(kwargs, move_cache=move_cache)
+
         # Solve the puzzle for each test case
         for idx, n_disks in enumerate(test_cases):
-            hanoi = Hanoi(
-                n_disks=n_disks,
-                verbose=kwargs.get("verbose"),
-            )
+            hanoi = create_solver(n_disks=n_disks, kwargs=kwargs)
             hanoi()  # Solve the puzzle and log the steps
 
             # If there are more test cases, ask the user to press Enter to continue
@@ -51,10 +101,7 @@ def main(**kwargs):
                 input("Press enter to continue for next test")
     else:
         # Solve the puzzle for a single specified number of disks
-        hanoi = Hanoi(
-            n_disks=kwargs.get("n_disks"),
-            verbose=kwargs.get("verbose"),
-        )
+        hanoi = create_solver(n_disks=kwargs.get("n_disks"), kwargs=kwargs)
         hanoi()  # Solve the puzzle and log the steps
 
 
@@ -69,6 +116,9 @@ if __name__ == "__main__":
     #     - --n_disks (int): The number of disks in the Towers of Hanoi puzzle.
     #     - --test_path (str): Path to a file containing test cases.
     #     - --verbose (bool): Boolean flag to control verbosity (default is `True`).
+    #     - --log_format (str): Format of the move log, "text" or "binary" (default is "text").
+    #     - --jobs (int): Number of worker processes generating the moves (default is 1).
+    #     - --pegs (int): Number of pegs (default is 3).
     #
 
     # Create an ArgumentParser object for handling command-line arguments
@@ -100,9 +150,42 @@ if __name__ == "__main__":
         help="If True, prints the steps to standard output. If False, only logs them.",
     )
 
+    # Format of the move log; the binary format stores 3 bits per move
+    parser.add_argument(
+        "--log_format",
+        type=str,
+        choices=["text", "binary"],
+        required=False,
+        default="text",
+        help="Format of the move log: full text or compact binary (decode with replay.py).",
+    )
+
+    # Number of worker processes; each of them generates a contiguous range of moves
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        required=False,
+        default=1,
+        help="Number of worker processes generating the moves in contiguous ranges.",
+    )
+
+    # Number of pegs; more than three pegs are solved with the Frame–Stewart algorithm
+    parser.add_argument(
+        "--pegs",
+        type=int,
+        required=False,
+        default=3,
+        help="Number of pegs. More than three pegs only support the text log with one job.",
+    )
+
     # Parse the command-line arguments
     args = parser.parse_args()
 
+    if args.pegs < 3:
+        parser.error("--pegs must be at least 3")
+    if args.pegs > 3 and (args.jobs > 1 or args.log_format != "text"):
+        parser.error("--jobs and --log_format binary are only supported with 3 pegs")
+
     # Print parsed arguments for debugging (optional)
     print(args)
 
@@ -111,4 +194,7 @@ if __name__ == "__main__":
         n_disks=args.n_disks,
         verbose=args.verbose,
         test_path=args.test_path,
+        log_format=args.log_format,
+        jobs=args.jobs,
+        pegs=args.pegs,
     )
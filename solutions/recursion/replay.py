@@ -0,0 +1,77 @@
+"""
+Decoder for the binary move logs of the Towers of Hanoi puzzle.
+
+This script turns a binary move log written with `--log_format binary` back into the
+lines of the text log, optionally reconstructing the state of the pegs after every move.
+
+Usage:
+    - Provide the path of the binary log (`--log_path`).
+    - The `--states` flag adds the state of the pegs after each move.
+    - The `--output_path` option writes the decoded log to a file instead of the console.
+"""
+
+from argparse import ArgumentParser
+import sys
+
+from src.movelog import replay
+
+
+def main(**kwargs) -> None:
+    """
+    Decode a binary move log and write the text form of it.
+
+    Args:
+        kwargs (dict): Dictionary of arguments that may include:
+            - log_path (str): Path of the binary move log.
+            - states (bool): Flag to include the state of the pegs after each move.
+            - output_path (str): Path of the text file to write. Defaults to the
+                standard output.
+    """
+    output_path = kwargs.get("output_path")
+    output = open(output_path, "w") if output_path else sys.stdout
+
+    try:
+        for line in replay(path=kwargs.get("log_path"), states=kwargs.get("states")):
+            output.write(line + "\n")
+    finally:
+        if output_path:
+            output.close()
+
+
+if __name__ == "__main__":
+    # Create an ArgumentParser object for handling command-line arguments
+    parser = ArgumentParser(description="Decode a binary Towers of Hanoi move log.")
+
+    # Path of the binary move log to decode
+    parser.add_argument(
+        "--log_path",
+        type=str,
+        required=True,
+        help="Path of the binary move log.",
+    )
+
+    # Flag to reconstruct the state of the pegs after every move
+    parser.add_argument(
+        "--states",
+        action="store_true",
+        help="If set, prints the state of the pegs after each move.",
+    )
+
+    # Optional output file for the decoded log
+    parser.add_argument(
+        "--output_path",
+        type=str,
+        required=False,
+        default=None,
+        help="Path of the text file to write. Defaults to the standard output.",
+    )
+
+    # Parse the command-line arguments
+    args = parser.parse_args()
+
+    # Call the main function with the parsed arguments
+    main(
+        log_path=args.log_path,
+        states=args.states,
+        output_path=args.output_path,
+    )
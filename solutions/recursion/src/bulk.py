@@ -0,0 +1,137 @@
+"""
+Module for bulk generation of the Towers of Hanoi move sequence as NumPy columns.
+
+The closed form of `iter_moves` only uses bit operations on the step index, so it can be
+evaluated on whole ranges of steps at once: the moved disk is one more than the number of
+trailing zeros of the step, and the pegs come from `(k & (k - 1)) % 3` and
+`((k | (k - 1)) + 1) % 3`. The sequence is produced in chunks of uint8 columns
+(disk, from, to) without a Python-level loop per move.
+
+Functions:
+    - iter_move_chunks(n_disks, start, stop, chunk_size): Lazily generates the moves in chunks.
+    - move_columns(n_disks, start, stop): Returns a range of moves as three columns.
+    - save_moves(path, n_disks, chunk_size): Writes the whole sequence to a .npy file.
+"""
+
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+# Number of steps generated at once
+CHUNK_SIZE = 1 << 22
+
+# Steps are held in uint64, which limits the number of disks
+MAX_DISKS = 63
+
+
+def iter_move_chunks(
+    n_disks: int,
+    start: int = 1,
+    stop: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Lazily generate the moves of the optimal solution in chunks of columns.
+
+    Args:
+        n_disks (int): The number of disks in the puzzle.
+        start (int, optional): The first step to generate (1-based). Defaults to 1.
+        stop (int, optional): The step at which to stop (exclusive). Defaults to the end
+                              of the solution.
+        chunk_size (int, optional): The number of moves per chunk. Defaults to `CHUNK_SIZE`.
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The uint8 columns of the moved disks and
+            of the indices of the pegs they are moved from and to, as in `iter_moves`.
+
+    Raises:
+        ValueError: If the number of disks does not fit the uint64 step indices, or if the
+                    steps do not satisfy 1 <= start <= stop <= 2^n.
+    """
+    if n_disks > MAX_DISKS:
+        raise ValueError(f"At most {MAX_DISKS} disks are supported")
+    if stop is None:
+        stop = 1 << n_disks
+    if not 1 <= start <= stop <= 1 << n_disks:
+        raise ValueError(
+            f"Steps {start} to {stop} are out of range for {n_disks} disks"
+        )
+
+    # Peg index relabelling that makes the tower always end up on the destination peg
+    order = np.array((0, 2, 1) if n_disks % 2 == 0 else (0, 1, 2), dtype=np.uint8)
+    one = np.uint64(1)
+
+    for chunk_start in range(start, stop, chunk_size):
+        steps = np.arange(chunk_start, min(chunk_start + chunk_size, stop), dtype=np.uint64)
+        previous = steps - one
+
+        # The lowest set bit is 2^j with j trailing zeros; frexp returns its exponent j + 1
+        lowest = steps & (~steps + one)
+        disks = np.frexp(lowest.astype(np.float64))[1].astype(np.uint8)
+
+        sources = order[((steps & previous) % np.uint64(3)).astype(np.intp)]
+        destinations = order[(((steps | previous) + one) % np.uint64(3)).astype(np.intp)]
+
+        yield disks, sources, destinations
+
+
+def move_columns(
+    n_disks: int, start: int = 1, stop: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return a range of moves of the optimal solution as three uint8 columns.
+
+    Args:
+        n_disks (int): The number of disks in the puzzle.
+        start (int, optional): The first step to generate (1-based). Defaults to 1.
+        stop (int, optional): The step at which to stop (exclusive). Defaults to the end
+                              of the solution.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The moved disks and the indices of the
+            pegs they are moved from and to.
+
+    Raises:
+        ValueError: If the number of disks does not fit the uint64 step indices, or if the
+                    steps do not satisfy 1 <= start <= stop <= 2^n.
+    """
+    chunks = list(iter_move_chunks(n_disks, start, stop))
+    if not chunks:
+        empty = np.empty(0, dtype=np.uint8)
+        return empty, empty.copy(), empty.copy()
+
+    return tuple(np.concatenate(column) for column in zip(*chunks))
+
+
+def save_moves(path: str, n_disks: int, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Write the whole move sequence to a .npy file of shape (2^n - 1, 3).
+
+    The file is memory-mapped and filled chunk by chunk, so the sequence never has to fit
+    in memory as a whole.
+
+    Args:
+        path (str): The path of the .npy file to create.
+        n_disks (int): The number of disks in the puzzle.
+        chunk_size (int, optional): The number of moves per chunk. Defaults to `CHUNK_SIZE`.
+
+    Raises:
+        ValueError: If the number of disks does not fit the uint64 step indices.
+    """
+    # Checked before the file is created, so that no stray file is left behind
+    if n_disks > MAX_DISKS:
+        raise ValueError(f"At most {MAX_DISKS} disks are supported")
+
+    total = (1 << n_disks) - 1
+    moves = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(total, 3))
+
+    offset = 0
+    for disks, sources, destinations in iter_move_chunks(n_disks, chunk_size=chunk_size):
+        size = len(disks)
+        moves[offset : offset + size, 0] = disks
+        moves[offset : offset + size, 1] = sources
+        moves[offset : offset + size, 2] = destinations
+        offset += size
+
+    moves.flush()
+    del moves
@@ -0,0 +1,198 @@
+"""
+Module for solving the Towers of Hanoi puzzle with more than three pegs.
+
+This module defines a `FrameStewart` class that solves the puzzle on any number of pegs
+with the Frame–Stewart algorithm: the `t` smallest disks are parked on an intermediate peg
+using all pegs, the remaining disks are moved to the destination with one peg fewer, and
+the parked disks are moved on top of them. The best split point `t` for every number of
+disks and pegs comes from a dynamic programming table, which is computed once per
+(number of disks, number of pegs) and cached for the whole process, so solving many puzzles
+in a batch does not rebuild it.
+
+The pegs, the logging and the step count are those of `Hanoi`, through their shared base
+class `HanoiBoard`; this module only generates the moves.
+"""
+
+from functools import lru_cache
+import string
+from typing import Iterator, Optional, Sequence, Tuple
+
+from src.hanoi import HanoiBoard
+from src.moves import iter_moves
+
+
+@lru_cache(maxsize=None)
+def split_table(
+    n_disks: int, n_pegs: int
+) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    Compute the minimal move counts and the best split points of the Frame–Stewart
+    algorithm.
+
+    With three pegs `m` disks need `2^m - 1` moves and the split is `m - 1`. With more pegs
+    the cost of `m` disks is the minimum over `t` of `2 * cost(t, pegs) + cost(m - t, pegs - 1)`.
+    The table of `pegs - 1` pegs is taken from the cache as well.
+
+    Args:
+        n_disks (int): The largest number of disks in the table.
+        n_pegs (int): The number of pegs.
+
+    Returns:
+        Tuple[Tuple[int, ...], Tuple[int, ...]]: The minimal number of moves and the best
+                                                 split point for 0 to `n_disks` disks.
+
+    Raises:
+        ValueError: If there are fewer than three pegs.
+    """
+    if n_pegs < 3:
+        raise ValueError("At least three pegs are needed")
+
+    if n_pegs == 3:
+        return (
+            tuple((1 << m) - 1 for m in range(n_disks + 1)),
+            tuple(max(m - 1, 0) for m in range(n_disks + 1)),
+        )
+
+    fewer_costs, _ = split_table(n_disks, n_pegs - 1)
+    costs = [0] * (n_disks + 1)
+    splits = [0] * (n_disks + 1)
+
+    for m in range(1, n_disks + 1):
+        if m == 1:
+            costs[m] = 1
+            continue
+
+        costs[m], splits[m] = min(
+            (2 * costs[t] + fewer_costs[m - t], t) for t in range(1, m)
+        )
+
+    return tuple(costs), tuple(splits)
+
+
+class FrameStewart(HanoiBoard):
+    """
+    Class to represent and solve the Towers of Hanoi puzzle on any number of pegs.
+
+    The pegs, the log and the step count are those of `HanoiBoard`.
+
+    Attributes:
+        n_pegs (int): The number of pegs.
+    """
+
+    def __init__(
+        self,
+        n_disks: int,
+        n_pegs: int,
+        verbose: bool,
+        peg_names: Optional[Sequence[str]] = None,
+    ) -> None:
+        """
+        Initializes the FrameStewart class with the given number of disks and pegs.
+
+        Args:
+            n_disks (int): The number of disks in the puzzle.
+            n_pegs (int): The number of pegs in the puzzle.
+            verbose (bool): Controls whether the steps are printed to standard output.
+            peg_names (Sequence[str], optional): The names of the pegs, from the source to
+                the destination. Defaults to consecutive capital letters.
+
+        Raises:
+            ValueError: If there are fewer than three pegs or the number of peg names does
+                not match the number of pegs.
+        """
+        if n_pegs < 3:
+            raise ValueError("At least three pegs are needed")
+        if peg_names is None:
+            peg_names = string.ascii_uppercase[:n_pegs]
+        if len(peg_names) != n_pegs:
+            raise ValueError("The number of peg names must match the number of pegs")
+
+        # The number of pegs is part of the log file name
+        super().__init__(
+            n_disks=n_disks,
+            verbose=verbose,
+            peg_names=peg_names,
+            log_suffix=f"_{n_pegs}_pegs",
+        )
+        self.n_pegs = n_pegs
+
+    def _start_message(self) -> str:
+        """
+        Return the first line of the log, with the number of pegs.
+
+        Returns:
+            str: The message announcing the puzzle.
+        """
+        return f"Starting Towers of Hanoi with {self.n_pegs} pegs and disks: {self.disks}"
+
+    def _solve(self) -> None:
+        """
+        Play the moves generated by `moves` on the pegs.
+        """
+        for disk, source, destination in self.moves():
+            self._base(disk, source, destination)
+
+    @property
+    def minimal_moves(self) -> int:
+        """
+        The number of moves of the Frame–Stewart solution.
+
+        Returns:
+            int: The number of moves, taken from the cached split table.
+        """
+        costs, _ = split_table(len(self.disks), self.n_pegs)
+        return costs[len(self.disks)]
+
+    def moves(self) -> Iterator[Tuple[int, int, int]]:
+        """
+        Lazily generate the moves of the Frame–Stewart solution without touching the pegs.
+
+        Yields:
+            Tuple[int, int, int]: The moved disk and the indices of the pegs it is moved
+                                  from and to.
+        """
+        pegs = (0, self.n_pegs - 1) + tuple(range(1, self.n_pegs - 1))
+        return self.__moves(len(self.disks), 0, pegs)
+
+    def __moves(
+        self, n_disks: int, offset: int, pegs: Tuple[int, ...]
+    ) -> Iterator[Tuple[int, int, int]]:
+        """
+        Generate the moves of a subtower of consecutive disks.
+
+        Args:
+            n_disks (int): The number of disks in the subtower.
+            offset (int): The number of smaller disks that are not part of the subtower.
+            pegs (Tuple[int, ...]): The usable pegs: the source, the destination and the
+                                    spare pegs.
+        """
+        if n_disks == 0:
+            return
+
+        source, destination, spares = pegs[0], pegs[1], pegs[2:]
+
+        if len(pegs) == 3:
+            # The three-peg case has a closed form, no need to split further
+            order = (source, spares[0], destination)
+            for disk, move_from, move_to in iter_moves(n_disks):
+                yield disk + offset, order[move_from], order[move_to]
+            return
+
+        _, splits = split_table(len(self.disks), len(pegs))
+        split = splits[n_disks]
+        if split == 0:
+            yield offset + 1, source, destination
+            return
+
+        parking, others = spares[0], spares[1:]
+
+        # Park the smallest disks using every peg
+        yield from self.__moves(split, offset, (source, parking, destination) + others)
+
+        # Move the largest disks without touching the parking peg
+        yield from self.__moves(
+            n_disks - split, offset + split, (source, destination) + others
+        )
+
+        # Bring the parked disks on top of them
+        yield from self.__moves(split, offset, (parking, destination, source) + others)
@@ -1,36 +1,58 @@
 """
-Module for solving the Towers of Hanoi puzzle using recursion.
+Module for solving the Towers of Hanoi puzzle.
 
 This module defines a `Hanoi` class that implements the solution to the Towers of Hanoi 
-puzzle using recursion. The class allows solving the puzzle for a given number of disks, 
-logging the steps of the process, and measuring the time taken for the solution. The puzzle 
-can be solved either by specifying a fixed number of disks or using the default behavior.
+puzzle. The class allows solving the puzzle for a given number of disks, logging the steps
+of the process, and measuring the time taken for the solution. The puzzle can be solved
+either by specifying a fixed number of disks or using the default behavior.
+
+The moves of the optimal solution are derived directly from the bit pattern of the step
+index by the functions of `src.moves`, so the sequence can be produced lazily without
+recursion, and any single move or state can be computed without simulating the earlier
+steps. The state of the pegs is kept as a disk-to-peg array and a bitmask per peg, so a
+move costs O(1) and the readable form of the pegs is only built when it is requested.
+With `jobs` greater than one the moves are generated by a process pool (see
+`src.parallel`).
+
+The pegs, the logging and the step count live in `HanoiBoard`, which is shared with the
+solver for more pegs (`src.frame_stewart`); the solvers only generate the moves.
 """
 
+from array import array
 import time
-from typing import List
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 import os
 
+from src.move_cache import MAX_CACHED_DISKS, MoveCache
+from src.movelog import MoveLogWriter
+from src.moves import iter_moves, iter_moves_between, move_at, state_at
+from src.parallel import write_sharded
 
-class Hanoi:
+# Folder of the text and binary logs of the puzzles
+LOG_FOLDER_PATH = "./logs/hanoi"
+
+
+class HanoiBoard:
     """
-    Class to represent and solve the Towers of Hanoi puzzle.
+    Base class holding the pegs of a Towers of Hanoi puzzle, its log and its step count.
 
-    This class implements a recursive solution to the Towers of Hanoi puzzle, where the
-    objective is to move a set of disks from a source peg to a destination peg, using an
-    auxiliary peg as a temporary storage. The solution process is logged, and the time
-    taken to solve the puzzle is measured. The puzzle can be solved for a specific number
-    of disks, and verbosity of logging can be controlled.
+    The solvers generate the moves in `_solve` and play each of them with `_base`; calling
+    the board runs the solution, logs it and measures the time it takes.
 
     Attributes:
         verbose (bool): Controls whether the steps are printed to standard output.
-        disks (List[int]): A list representing the disks, ordered from largest (topmost) to smallest.
-        source_name (str): Name of the source peg.
-        auxiliary_name (str): Name of the auxiliary peg.
-        destination_name (str): Name of the destination peg.
-        pegs (dict): A dictionary storing the disks on each peg.
+        disks (List[int]): A list representing the disks, ordered from largest to smallest.
+        peg_names (Tuple[str, ...]): Names of the pegs; the first one is the source and the
+            last one is the destination.
+        positions (array): The index of the peg of each disk, the smallest disk first.
+        masks (List[int]): A bitmask per peg, in which bit `d - 1` is set if disk `d` is on
+            the peg.
         log_file (file object): A file object used for logging the steps.
         log_file_name (str): The name of the log file.
+        log_stem (str): The log file name without its extension, shared by the other logs
+            of the puzzle.
+        move_log (MoveLogWriter or None): Writer of the binary move log, if a solver logs
+            the moves in the binary format.
         step_count (int): A counter for the number of steps taken to solve the puzzle.
     """
 
@@ -38,69 +60,64 @@ class Hanoi:
         self,
         n_disks: int,
         verbose: bool,
-        source: str = "A",
-        auxiliary: str = "B",
-        destination: str = "C",
+        peg_names: Sequence[str],
+        log_suffix: str = "",
     ) -> None:
         """
-        Initializes the Hanoi class with the given number of disks and verbosity setting.
+        Initializes the board with all disks on the first peg and opens its log file.
 
         Args:
             n_disks (int): The number of disks in the puzzle.
             verbose (bool): Controls whether the steps are printed to standard output.
-            source (str, optional): The name of the source peg. Defaults to 'A'.
-            auxiliary (str, optional): The name of the auxiliary peg. Defaults to 'B'.
-            destination (str, optional): The name of the destination peg. Defaults to 'C'.
+            peg_names (Sequence[str]): The names of the pegs, from the source to the
+                destination.
+            log_suffix (str, optional): Appended to the name of the log file after the
+                number of disks. Defaults to ''.
         """
         self.verbose = verbose
         # Initialize disks as a list of integers, from largest to smallest
-        self.disks = list(
-            range(n_disks, 0, -1)
-        )  # List of disk sizes from largest to smallest
-        self.source_name = source
-        self.auxiliary_name = auxiliary
-        self.destination_name = destination
+        self.disks = list(range(n_disks, 0, -1))
+        self.peg_names = tuple(peg_names)
 
-        # Initialize pegs as lists with disks on the source peg
-        self.pegs = {
-            source: self.disks[:],  # Start with all disks on the source peg
-            auxiliary: [],  # Auxiliary peg starts empty
-            destination: [],  # Destination peg starts empty
-        }
+        # Start with all disks on the source peg, the other pegs are empty
+        self.positions = array("B", bytes(n_disks))
+        self.masks = [(1 << n_disks) - 1] + [0] * (len(self.peg_names) - 1)
 
         # Log file name based on the current time and number of disks
         start_time = time.strftime("%Y%m%d_%H%M%S")
-        self.log_file_name = f"hanoi_{start_time}_{n_disks}_disks.log"
-
-        log_folder_path = "./logs/hanoi"
+        self.log_stem = f"hanoi_{start_time}_{n_disks}_disks{log_suffix}"
+        self.log_file_name = f"{self.log_stem}.log"
 
         # Open log file for writing
-        self.log_file = open(os.path.join(log_folder_path, self.log_file_name), "w")
+        self.log_file = open(os.path.join(LOG_FOLDER_PATH, self.log_file_name), "w")
+
+        # Moves are logged as text unless a solver opens a binary move log
+        self.move_log = None
         self.step_count = 0  # Initialize step count
 
     def __call__(self) -> None:
         """
-        Start solving the Towers of Hanoi puzzle and log the process.
+        Start solving the puzzle and log the process.
 
-        This method initiates the recursive solution for the Towers of Hanoi puzzle,
-        logs the steps, and measures the time taken for the solution.
+        This method plays the moves generated by `_solve` on the pegs, logs the steps,
+        and measures the time taken for the solution.
         """
-        self.__log("Starting Towers of Hanoi with disks: " + str(self.disks))
+        self._log(self._start_message())
 
         # Record the start time of the process
         start_time = time.perf_counter()
 
-        # Begin the recursive process of solving the puzzle
-        self.__recursive(
-            self.disks, self.source_name, self.auxiliary_name, self.destination_name
-        )
+        self._solve()
+
+        if self.move_log is not None:
+            self.move_log.close()
 
         # Record the end time and calculate the elapsed time
         end_time = time.perf_counter()
         time_elapsed = end_time - start_time
 
         # Log the total number of steps taken and the time elapsed
-        self.__log(
+        self._log(
             f"Total steps taken: {self.step_count}\nTime elapsed: {time_elapsed} seconds\nNumber of disks: {len(self.disks)}"
         )
         self.log_file.close()
@@ -110,47 +127,43 @@ class Hanoi:
         Return a string representation of the current state of the pegs.
 
         Returns:
-            str: A formatted string showing the state of each peg (source, auxiliary, destination).
+            str: A formatted string showing the state of each peg, one per line.
         """
-        return (
-            f"{self.source_name}: {self.pegs[self.source_name]}\n"
-            f"{self.auxiliary_name}: {self.pegs[self.auxiliary_name]}\n"
-            f"{self.destination_name}: {self.pegs[self.destination_name]}"
-        )
+        return "\n".join(f"{name}: {disks}" for name, disks in self.pegs.items())
 
-    def __recursive(
-        self, disks: List[int], source: str, auxiliary: str, destination: str
-    ) -> None:
+    @property
+    def pegs(self) -> Dict[str, List[int]]:
         """
-        Recursively solve the Towers of Hanoi puzzle.
+        The disks on each peg, from the bottom to the top.
 
-        This function uses recursion to move the disks from the source peg to the destination
-        peg by using the auxiliary peg as a temporary holding area. It follows the recursive
-        steps of the Towers of Hanoi problem:
-        1. Move n-1 disks from source to auxiliary peg.
-        2. Move the largest disk to the destination peg.
-        3. Move the n-1 disks from auxiliary peg to destination peg.
+        Returns:
+            Dict[str, List[int]]: The list of disks of each peg, keyed by the peg name.
+        """
+        n_disks = len(self.disks)
+        return {
+            name: [disk for disk in range(n_disks, 0, -1) if mask >> (disk - 1) & 1]
+            for name, mask in zip(self.peg_names, self.masks)
+        }
 
-        Args:
-            disks (List[int]): List of disks to move.
-            source (str): The source peg.
-            auxiliary (str): The auxiliary peg.
-            destination (str): The destination peg.
-        """
-        if len(disks) == 1:
-            # Base case: only one disk to move
-            self.__base(disks[0], source, destination)  # Move the largest disk
-        else:
-            # Step 1: Move n-1 disks from source to auxiliary
-            self.__recursive(disks[1:], source, destination, auxiliary)
+    def _start_message(self) -> str:
+        """
+        Return the first line of the log.
+
+        Returns:
+            str: The message announcing the puzzle.
+        """
+        return "Starting Towers of Hanoi with disks: " + str(self.disks)
 
-            # Step 2: Move the largest disk from source to destination
-            self.__base(disks[0], source, destination)
+    def _solve(self) -> None:
+        """
+        Play every move of the solution on the pegs, implemented by the solvers.
 
-            # Step 3: Move the n-1 disks from auxiliary to destination
-            self.__recursive(disks[1:], auxiliary, source, destination)
+        Raises:
+            NotImplementedError: If the board has no solver.
+        """
+        raise NotImplementedError
 
-    def __base(self, disk: int, source: str, destination: str) -> None:
+    def _base(self, disk: int, source: int, destination: int) -> None:
         """
         Handle the base case by moving a single disk and updating peg states.
 
@@ -159,19 +172,28 @@ class Hanoi:
 
         Args:
             disk (int): The disk to move.
-            source (str): The source peg from which the disk is moved.
-            destination (str): The destination peg to which the disk is moved.
+            source (int): The index of the source peg from which the disk is moved.
+            destination (int): The index of the destination peg to which the disk is moved.
         """
         # Move the disk from the source peg to the destination peg
-        self.pegs[source].remove(disk)
-        self.pegs[destination].append(disk)
+        bit = 1 << (disk - 1)
+        self.positions[disk - 1] = destination
+        self.masks[source] ^= bit
+        self.masks[destination] |= bit
         self.step_count += 1  # Increment the step count
 
+        if self.move_log is not None:
+            # Only the peg pair is stored, the disk is implied by the step index
+            self.move_log.write(source, destination)
+            return
+
         # Log the move
-        self.__log(f"Move disk {disk} from {source} to {destination}")
-        self.__log(str(self))  # Log the current state of the pegs after each move
+        self._log(
+            f"Move disk {disk} from {self.peg_names[source]} to {self.peg_names[destination]}"
+        )
+        self._log(str(self))  # Log the current state of the pegs after each move
 
-    def __log(self, message: str) -> None:
+    def _log(self, message: str) -> None:
         """
         Log a message to the log file and optionally print it to the console.
 
@@ -184,3 +206,205 @@ class Hanoi:
         # Optionally print the message to the console based on verbosity
         if self.verbose:
             print(message + "\n")
+
+
+class Hanoi(HanoiBoard):
+    """
+    Class to represent and solve the Towers of Hanoi puzzle.
+
+    This class implements an iterative solution to the Towers of Hanoi puzzle, where the
+    objective is to move a set of disks from a source peg to a destination peg, using an
+    auxiliary peg as a temporary storage. The solution process is logged, and the time
+    taken to solve the puzzle is measured. The puzzle can be solved for a specific number
+    of disks, and verbosity of logging can be controlled.
+
+    The pegs, the log and the step count are those of `HanoiBoard`.
+
+    Attributes:
+        jobs (int): The number of worker processes generating the moves.
+        move_cache (MoveCache or None): A move sequence shared by the puzzles of a batch.
+        source_name (str): Name of the source peg.
+        auxiliary_name (str): Name of the auxiliary peg.
+        destination_name (str): Name of the destination peg.
+    """
+
+    def __init__(
+        self,
+        n_disks: int,
+        verbose: bool,
+        source: str = "A",
+        auxiliary: str = "B",
+        destination: str = "C",
+        log_format: str = "text",
+        jobs: int = 1,
+        move_cache: Optional[MoveCache] = None,
+    ) -> None:
+        """
+        Initializes the Hanoi class with the given number of disks and verbosity setting.
+
+        Args:
+            n_disks (int): The number of disks in the puzzle.
+            verbose (bool): Controls whether the steps are printed to standard output.
+            source (str, optional): The name of the source peg. Defaults to 'A'.
+            auxiliary (str, optional): The name of the auxiliary peg. Defaults to 'B'.
+            destination (str, optional): The name of the destination peg. Defaults to 'C'.
+            log_format (str, optional): Either 'text', to log every move together with the
+                state of the pegs, or 'binary', to write the moves to a compact binary
+                move log (see `src.movelog`). Defaults to 'text'.
+            jobs (int, optional): The number of worker processes generating the moves. With
+                more than one worker the moves are written without the peg states and are
+                not printed. Defaults to 1.
+            move_cache (MoveCache, optional): A move sequence shared by the puzzles of a
+                batch; the moves of a puzzle of up to `MAX_CACHED_DISKS` disks are then
+                sliced from it instead of being computed. Defaults to None.
+
+        Raises:
+            ValueError: If `log_format` is neither 'text' nor 'binary'.
+        """
+        if log_format not in ("text", "binary"):
+            raise ValueError(f"Unknown log format: {log_format}")
+
+        super().__init__(
+            n_disks=n_disks, verbose=verbose, peg_names=(source, auxiliary, destination)
+        )
+        self.jobs = jobs
+        self.move_cache = move_cache
+        self.source_name = source
+        self.auxiliary_name = auxiliary
+        self.destination_name = destination
+
+        # Moves go to a separate binary log when the binary format is requested
+        if log_format == "binary":
+            self.move_log = MoveLogWriter(
+                path=os.path.join(LOG_FOLDER_PATH, f"{self.log_stem}.hlog"),
+                n_disks=n_disks,
+                peg_names=self.peg_names,
+            )
+
+    def _solve(self) -> None:
+        """
+        Play the moves generated by `iter_moves` on the pegs, or write them with a process
+        pool and jump to the final state when there are several jobs.
+        """
+        if self.jobs > 1:
+            # Generate the moves in parallel and jump straight to the final state
+            self.step_count = write_sharded(
+                n_disks=len(self.disks),
+                jobs=self.jobs,
+                log_file=self.log_file,
+                move_log=self.move_log,
+                peg_names=self.peg_names,
+            )
+            self.restore(bytes(state_at(len(self.disks), self.step_count)))
+        else:
+            # Play every move of the optimal solution on the pegs
+            # The cache is bounded, the larger puzzles generate their moves one by one
+            if self.move_cache is not None and len(self.disks) <= MAX_CACHED_DISKS:
+                moves = self.move_cache.iter_moves(len(self.disks))
+            else:
+                moves = iter_moves(len(self.disks))
+
+            for disk, source, destination in moves:
+                self._base(disk, source, destination)
+
+    def snapshot(self) -> bytes:
+        """
+        Return a compact, serializable snapshot of the current state of the pegs.
+
+        Returns:
+            bytes: The index of the peg of each disk, the smallest disk first.
+        """
+        return self.positions.tobytes()
+
+    def restore(self, snapshot: bytes) -> None:
+        """
+        Restore the state of the pegs from a snapshot taken by `snapshot`.
+
+        Args:
+            snapshot (bytes): The index of the peg of each disk, the smallest disk first.
+
+        Raises:
+            ValueError: If the snapshot does not describe the disks of this puzzle.
+        """
+        if len(snapshot) != len(self.disks) or not set(snapshot) <= {0, 1, 2}:
+            raise ValueError("Snapshot does not match the pegs of this puzzle")
+
+        self.positions = array("B", snapshot)
+        self.masks = [0, 0, 0]
+        for disk, peg in enumerate(snapshot, 1):
+            self.masks[peg] |= 1 << (disk - 1)
+
+    def moves(
+        self, start: int = 1, stop: Optional[int] = None
+    ) -> Iterator[Tuple[int, str, str]]:
+        """
+        Lazily generate the moves of the optimal solution without touching the pegs.
+
+        Each move is computed from its step index alone, so no per-move list copies are
+        made and the full sequence of `2^n - 1` moves can be consumed in constant memory.
+
+        Args:
+            start (int, optional): The first step to generate (1-based). Defaults to 1.
+            stop (int, optional): The step at which to stop (exclusive). Defaults to the
+                                  end of the solution.
+
+        Yields:
+            Tuple[int, str, str]: The moved disk and the names of the source and
+                                  destination pegs of the move.
+        """
+        names = self.peg_names
+        for disk, source, destination in iter_moves(len(self.disks), start, stop):
+            yield disk, names[source], names[destination]
+
+    def moves_to(self, target: Sequence[int]) -> Iterator[Tuple[int, str, str]]:
+        """
+        Lazily generate the shortest move sequence from the current state of the pegs to
+        an arbitrary target configuration, e.g. to resume a partially played board restored
+        with `restore`.
+
+        Args:
+            target (Sequence[int]): The index of the peg of each disk in the configuration
+                                    to reach, the smallest disk first.
+
+        Yields:
+            Tuple[int, str, str]: The moved disk and the names of the source and
+                                  destination pegs of the move.
+        """
+        names = self.peg_names
+        for disk, source, destination in iter_moves_between(self.positions, target):
+            yield disk, names[source], names[destination]
+
+    def move_at(self, step: int) -> Tuple[int, str, str]:
+        """
+        Return the move played at the given step without simulating the earlier steps.
+
+        Args:
+            step (int): The step of the move (1-based).
+
+        Returns:
+            Tuple[int, str, str]: The moved disk and the names of the source and
+                                  destination pegs of the move.
+        """
+        disk, source, destination = move_at(len(self.disks), step)
+        return disk, self.peg_names[source], self.peg_names[destination]
+
+    def state_at(self, step: int) -> Dict[str, List[int]]:
+        """
+        Return the state of the pegs after the given step without simulating the earlier
+        steps.
+
+        Args:
+            step (int): The number of moves already played (0 is the initial state).
+
+        Returns:
+            Dict[str, List[int]]: The disks on each peg, from the bottom to the top, in the
+                                  same form as `pegs`.
+        """
+        state = {name: [] for name in self.peg_names}
+        positions = state_at(len(self.disks), step)
+
+        # Walking from the largest disk keeps every peg ordered from bottom to top
+        for disk in range(len(positions), 0, -1):
+            state[self.peg_names[positions[disk - 1]]].append(disk)
+
+        return state
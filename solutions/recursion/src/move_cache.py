@@ -0,0 +1,114 @@
+"""
+Module for sharing the optimal Towers of Hanoi move sequence between puzzles of a batch.
+
+The optimal sequence for `n` disks is two copies of the sequence for `n - 1` disks with
+relabelled pegs around the move of the largest disk. Its first `2^m - 1` moves solve the
+puzzle of `m` disks, landing on the auxiliary peg instead of the destination when `n - m`
+is odd. A batch therefore only has to build the sequence of its largest puzzle, and every
+smaller puzzle is a prefix of it, relabelled if needed.
+
+Moves are stored one byte per move as the peg-pair codes of the binary move log (see
+`src.movelog`), so the doubling, the slicing and the relabelling are all done by `bytes`
+operations instead of a Python loop per move. The sequence of `n` disks takes `2^n`
+bytes, so only puzzles of up to `MAX_CACHED_DISKS` disks are served from the cache.
+"""
+
+from typing import Iterator, Tuple
+
+from src.movelog import PAIR_CODES, PAIRS
+
+
+def _relabel_table(mapping: Tuple[int, int, int]) -> bytes:
+    """
+    Build a `bytes.translate` table that relabels the pegs of peg-pair codes.
+
+    Args:
+        mapping (Tuple[int, int, int]): The new index of each peg.
+
+    Returns:
+        bytes: The translation table.
+    """
+    table = bytearray(range(256))
+    for code, (source, destination) in enumerate(PAIRS):
+        table[code] = PAIR_CODES[(mapping[source], mapping[destination])]
+    return bytes(table)
+
+
+# Largest puzzle served from the cache: its sequence takes 16 MiB, plus the copies made
+# while doubling; larger puzzles generate their moves with `iter_moves` in constant memory
+MAX_CACHED_DISKS = 24
+
+# First half of a sequence: the smaller tower goes to the auxiliary peg
+SWAP_AUXILIARY = _relabel_table((0, 2, 1))
+
+# Second half of a sequence: the smaller tower comes back from the auxiliary peg
+SWAP_SOURCE = _relabel_table((1, 0, 2))
+
+# Move of the largest disk in the middle of a sequence
+LARGEST_MOVE = bytes([PAIR_CODES[(0, 2)]])
+
+
+class MoveCache:
+    """
+    Cache of the optimal move sequence, shared by the puzzles of a batch.
+
+    Attributes:
+        n_disks (int): The number of disks of the cached sequence.
+        codes (bytes): The peg-pair code of every move of the cached sequence.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty cache.
+        """
+        self.n_disks = 0
+        self.codes = b""
+
+    def prepare(self, n_disks: int) -> None:
+        """
+        Extend the cached sequence up to the given number of disks by doubling.
+
+        Args:
+            n_disks (int): The number of disks of the largest puzzle of the batch.
+        """
+        while self.n_disks < n_disks:
+            self.codes = (
+                self.codes.translate(SWAP_AUXILIARY)
+                + LARGEST_MOVE
+                + self.codes.translate(SWAP_SOURCE)
+            )
+            self.n_disks += 1
+
+    def sequence(self, n_disks: int) -> bytes:
+        """
+        Return the peg-pair codes of the optimal sequence for the given number of disks.
+
+        Args:
+            n_disks (int): The number of disks.
+
+        Returns:
+            bytes: One peg-pair code per move.
+        """
+        self.prepare(n_disks)
+
+        codes = self.codes[: (1 << n_disks) - 1]
+        if (self.n_disks - n_disks) % 2:
+            # The prefix lands on the auxiliary peg, so swap it with the destination
+            codes = codes.translate(SWAP_AUXILIARY)
+
+        return codes
+
+    def iter_moves(self, n_disks: int) -> Iterator[Tuple[int, int, int]]:
+        """
+        Generate the moves of the optimal solution from the cached sequence.
+
+        Args:
+            n_disks (int): The number of disks.
+
+        Yields:
+            Tuple[int, int, int]: The moved disk and the indices of the pegs it is moved
+                                  from and to, as generated by `iter_moves`.
+        """
+        for step, code in enumerate(self.sequence(n_disks), 1):
+            source, destination = PAIRS[code]
+            yield (step & -step).bit_length(), source, destination
@@ -0,0 +1,293 @@
+"""
+Module for the compact binary move-log format of the Towers of Hanoi puzzle.
+
+The text log of `Hanoi` writes a sentence and a full dump of the pegs after every move,
+which makes the log grow as O(n * 2^n). The binary format stores only what cannot be
+derived: a small header followed by one 3-bit code per move identifying the ordered
+(from, to) peg pair. The moved disk is implied by the step index (one more than the number
+of trailing zeros of the step), so it is not stored at all.
+
+Layout (little-endian):
+    - magic (4 bytes): b"HNLG"
+    - version (uint8)
+    - number of disks (uint16)
+    - number of moves (uint64)
+    - the three peg names, each as a uint8 length followed by UTF-8 bytes
+    - the moves, packed eight per three bytes, least significant bits first
+
+Functions:
+    - encode_moves(moves): Packs a run of moves into the body format of the log.
+    - read_header(file): Reads and validates the header of a binary move log.
+    - iter_log_codes(path): Lazily decodes the peg-pair codes stored in a binary move log.
+    - iter_log_moves(path): Lazily decodes the moves stored in a binary move log.
+    - replay(path, states): Turns a binary move log back into the lines of the text log.
+"""
+
+import shutil
+import struct
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+MAGIC = b"HNLG"
+VERSION = 1
+
+# Fixed part of the header: magic, version, number of disks and number of moves
+HEADER = struct.Struct("<4sBHQ")
+
+# Ordered (from, to) peg pairs; the index of a pair is its 3-bit code in the log
+PAIRS = ((0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1))
+PAIR_CODES = {pair: code for code, pair in enumerate(PAIRS)}
+
+# Number of buffered bytes after which the writer flushes to disk
+FLUSH_SIZE = 1 << 16
+
+
+class MoveLogWriter:
+    """
+    Writer of the binary move-log format.
+
+    Moves are accumulated eight at a time into a 24-bit group which is appended to an
+    in-memory buffer as three bytes; the buffer is flushed to the file whenever it grows
+    beyond `FLUSH_SIZE`. The number of moves is patched into the header on `close`.
+
+    Attributes:
+        path (str): The path of the log file.
+        n_disks (int): The number of disks in the logged puzzle.
+        peg_names (Tuple[str, str, str]): Names of the source, auxiliary and destination pegs.
+        move_count (int): The number of moves written so far.
+    """
+
+    def __init__(
+        self, path: str, n_disks: int, peg_names: Tuple[str, str, str]
+    ) -> None:
+        """
+        Opens the log file and writes the header.
+
+        Args:
+            path (str): The path of the log file to create.
+            n_disks (int): The number of disks in the logged puzzle.
+            peg_names (Tuple[str, str, str]): Names of the source, auxiliary and
+                                              destination pegs.
+        """
+        self.path = path
+        self.n_disks = n_disks
+        self.peg_names = peg_names
+        self.move_count = 0
+
+        self.__file = open(path, "wb")
+        self.__file.write(HEADER.pack(MAGIC, VERSION, n_disks, 0))
+        for name in peg_names:
+            encoded = name.encode("utf-8")
+            self.__file.write(struct.pack("<B", len(encoded)) + encoded)
+
+        self.__buffer = bytearray()
+        self.__group = 0  # Bits of the moves not yet appended to the buffer
+        self.__pending = 0  # Number of moves in the current group
+
+    def __enter__(self) -> "MoveLogWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, source: int, destination: int) -> None:
+        """
+        Append a single move to the log.
+
+        Args:
+            source (int): The index of the peg the disk is moved from.
+            destination (int): The index of the peg the disk is moved to.
+        """
+        self.__group |= PAIR_CODES[(source, destination)] << (3 * self.__pending)
+        self.__pending += 1
+        self.move_count += 1
+
+        if self.__pending == 8:
+            self.__buffer += self.__group.to_bytes(3, "little")
+            self.__group = 0
+            self.__pending = 0
+
+            if len(self.__buffer) >= FLUSH_SIZE:
+                self.__file.write(self.__buffer)
+                self.__buffer.clear()
+
+    def extend(self, segment: BinaryIO, move_count: int) -> None:
+        """
+        Append a run of moves that was already packed by `encode_moves`.
+
+        The log must be at a group boundary, i.e. the number of moves written so far must
+        be a multiple of eight, so that the packed bytes can be copied as they are.
+
+        Args:
+            segment (BinaryIO): A binary file object holding the packed moves.
+            move_count (int): The number of moves in the segment.
+
+        Raises:
+            ValueError: If the log is not at a group boundary.
+        """
+        if self.__pending:
+            raise ValueError("Packed moves can only be appended at a group boundary")
+
+        self.__file.write(self.__buffer)
+        self.__buffer.clear()
+
+        shutil.copyfileobj(segment, self.__file)
+        self.move_count += move_count
+
+    def close(self) -> None:
+        """
+        Flush the remaining moves and patch the number of moves into the header.
+        """
+        if self.__file.closed:
+            return
+
+        if self.__pending:
+            # The trailing group is padded with zeros up to a whole byte
+            self.__buffer += self.__group.to_bytes((3 * self.__pending + 7) // 8, "little")
+
+        self.__file.write(self.__buffer)
+        self.__buffer.clear()
+
+        self.__file.seek(0)
+        self.__file.write(HEADER.pack(MAGIC, VERSION, self.n_disks, self.move_count))
+        self.__file.close()
+
+
+def encode_moves(moves: Iterable[Tuple[int, int]]) -> bytearray:
+    """
+    Pack a run of moves into the body format of the binary move log.
+
+    Runs whose length is a multiple of eight can be concatenated byte by byte; a shorter
+    trailing group is padded with zeros up to a whole byte.
+
+    Args:
+        moves (Iterable[Tuple[int, int]]): The indices of the source and destination
+                                           pegs of each move.
+
+    Returns:
+        bytearray: The packed moves.
+    """
+    buffer = bytearray()
+    group = 0
+    pending = 0
+
+    for pair in moves:
+        group |= PAIR_CODES[pair] << (3 * pending)
+        pending += 1
+        if pending == 8:
+            buffer += group.to_bytes(3, "little")
+            group = 0
+            pending = 0
+
+    if pending:
+        buffer += group.to_bytes((3 * pending + 7) // 8, "little")
+
+    return buffer
+
+
+def read_header(file: BinaryIO) -> Tuple[int, int, Tuple[str, str, str]]:
+    """
+    Read and validate the header of a binary move log.
+
+    Args:
+        file (BinaryIO): A binary file object positioned at the start of the log.
+
+    Returns:
+        Tuple[int, int, Tuple[str, str, str]]: The number of disks, the number of moves and
+                                               the names of the three pegs.
+
+    Raises:
+        ValueError: If the file is not a binary move log of a supported version.
+    """
+    magic, version, n_disks, move_count = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Not a binary Hanoi move log")
+    if version != VERSION:
+        raise ValueError(f"Unsupported move log version: {version}")
+
+    names = []
+    for _ in range(3):
+        (length,) = struct.unpack("<B", file.read(1))
+        names.append(file.read(length).decode("utf-8"))
+
+    return n_disks, move_count, tuple(names)
+
+
+def iter_log_codes(path: str) -> Iterator[int]:
+    """
+    Lazily decode the peg-pair codes stored in a binary move log.
+
+    Args:
+        path (str): The path of the binary move log.
+
+    Yields:
+        int: The 3-bit code of each move, an index into `PAIRS` for a well-formed log.
+
+    Raises:
+        ValueError: If the log holds fewer moves than its header announces.
+    """
+    with open(path, "rb") as file:
+        _, move_count, _ = read_header(file)
+
+        remaining = move_count
+        while remaining:
+            chunk = file.read(3 * 8192)
+            if not chunk:
+                raise ValueError("Truncated move log")
+
+            for offset in range(0, len(chunk), 3):
+                group = int.from_bytes(chunk[offset : offset + 3], "little")
+                for _ in range(min(8, remaining)):
+                    yield group & 7
+                    group >>= 3
+                remaining -= min(8, remaining)
+                if not remaining:
+                    return
+
+
+def iter_log_moves(path: str) -> Iterator[Tuple[int, str, str]]:
+    """
+    Lazily decode the moves stored in a binary move log.
+
+    Args:
+        path (str): The path of the binary move log.
+
+    Yields:
+        Tuple[int, str, str]: The moved disk and the names of the source and destination
+                              pegs of the move.
+    """
+    with open(path, "rb") as file:
+        _, _, names = read_header(file)
+
+    # Peg name pairs indexed by their 3-bit code
+    pairs = [(names[source], names[destination]) for source, destination in PAIRS]
+
+    for step, code in enumerate(iter_log_codes(path), 1):
+        source, destination = pairs[code]
+        yield (step & -step).bit_length(), source, destination
+
+
+def replay(path: str, states: bool = False) -> Iterator[str]:
+    """
+    Turn a binary move log back into the lines of the text log.
+
+    Args:
+        path (str): The path of the binary move log.
+        states (bool, optional): If True, the state of the pegs is reconstructed and
+                                 yielded after every move, like in the text log.
+                                 Defaults to False.
+
+    Yields:
+        str: A "Move disk ..." line per move, each optionally followed by the peg state.
+    """
+    with open(path, "rb") as file:
+        n_disks, _, names = read_header(file)
+
+    pegs: Dict[str, List[int]] = {name: [] for name in names}
+    pegs[names[0]] = list(range(n_disks, 0, -1))
+
+    for disk, source, destination in iter_log_moves(path):
+        yield f"Move disk {disk} from {source} to {destination}"
+
+        if states:
+            pegs[destination].append(pegs[source].pop())
+            yield "\n".join(f"{name}: {pegs[name]}" for name in names)
@@ -0,0 +1,337 @@
+"""
+Module for computing the moves of the optimal Towers of Hanoi solution from step indices.
+
+The optimal solution has a closed form in the binary representation of the step index:
+the disk moved at step `k` and the pegs it moves between depend only on `k`. The moves can
+therefore be produced lazily without recursion or copying the disk list at every level,
+and any single move, or the state of the pegs after any number of moves, can be computed
+in O(n) without simulating the earlier steps.
+
+The module also solves the puzzle between two arbitrary configurations, given as the
+index of the peg of each disk. Only the largest disk that is not in place decides how the
+smaller disks have to move, so the shortest sequence is built from the largest disk down
+in O(n) plus the number of moves, without searching the 3^n states.
+
+Pegs are identified by their index: 0 is the source, 1 the auxiliary and 2 the
+destination peg.
+
+Functions:
+    - iter_moves(n_disks, start, stop): Lazily generates a range of moves.
+    - move_at(n_disks, step): Computes a single move.
+    - state_at(n_disks, step): Computes the position of every disk after a number of moves.
+    - count_moves_between(start, target): Computes the length of the shortest sequence
+      between two configurations.
+    - iter_moves_between(start, target): Lazily generates that shortest sequence.
+"""
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+
+def iter_moves(
+    n_disks: int, start: int = 1, stop: Optional[int] = None
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Lazily generate the moves of the optimal solution from the step indices.
+
+    The disk moved at step `k` (1-based) is one more than the number of trailing zeros of
+    `k`; it leaves peg `(k & (k - 1)) % 3` and lands on peg `((k | (k - 1)) + 1) % 3`. These
+    formulas move the tower to the third peg for an odd number of disks and to the second
+    peg for an even number, so the last two pegs are swapped in the even case.
+
+    Args:
+        n_disks (int): The number of disks in the puzzle.
+        start (int, optional): The first step to generate (1-based). Defaults to 1.
+        stop (int, optional): The step at which to stop (exclusive). Defaults to `2^n`,
+                              i.e. the end of the solution.
+
+    Yields:
+        Tuple[int, int, int]: The moved disk (1 is the smallest) and the indices of the
+                              pegs it is moved from and to (0: source, 1: auxiliary,
+                              2: destination).
+    """
+    if stop is None:
+        stop = 1 << n_disks
+
+    # Peg index relabelling that makes the tower always end up on the destination peg
+    order = (0, 2, 1) if n_disks % 2 == 0 else (0, 1, 2)
+
+    for step in range(start, stop):
+        yield (
+            (step & -step).bit_length(),
+            order[(step & (step - 1)) % 3],
+            order[((step | (step - 1)) + 1) % 3],
+        )
+
+
+def move_at(n_disks: int, step: int) -> Tuple[int, int, int]:
+    """
+    Compute a single move of the optimal solution from its step index.
+
+    Args:
+        n_disks (int): The number of disks in the puzzle.
+        step (int): The step of the move (1-based).
+
+    Returns:
+        Tuple[int, int, int]: The moved disk and the indices of the pegs it is moved from
+                              and to, as generated by `iter_moves`.
+
+    Raises:
+        ValueError: If `step` is not between 1 and `2^n - 1`.
+    """
+    if not 1 <= step < 1 << n_disks:
+        raise ValueError(f"Step {step} is out of range for {n_disks} disks")
+
+    return next(iter_moves(n_disks, step, step + 1))
+
+
+def state_at(n_disks: int, step: int) -> List[int]:
+    """
+    Compute the position of every disk after a number of moves of the optimal solution.
+
+    The disks are placed from the largest to the smallest. The largest disk of a subtower
+    of `m` disks has already moved from its source to its destination exactly when the
+    remaining step count is at least `2^(m - 1)`; the smaller disks then form a subtower
+    that goes from the auxiliary peg to the destination, otherwise one that goes from the
+    source to the auxiliary peg. Every disk takes a single bit test, so the cost is O(n).
+
+    Args:
+        n_disks (int): The number of disks in the puzzle.
+        step (int): The number of moves already played (0 is the initial state).
+
+    Returns:
+        List[int]: The index of the peg of each disk, the smallest disk first.
+
+    Raises:
+        ValueError: If `step` is not between 0 and `2^n - 1`.
+    """
+    if not 0 <= step < 1 << n_disks:
+        raise ValueError(f"Step {step} is out of range for {n_disks} disks")
+
+    positions = [0] * n_disks
+    source, auxiliary, destination = 0, 1, 2
+
+    for disk in range(n_disks, 0, -1):
+        if step >> (disk - 1) & 1:
+            positions[disk - 1] = destination
+            source, auxiliary = auxiliary, source
+        else:
+            positions[disk - 1] = source
+            auxiliary, destination = destination, auxiliary
+
+    return positions
+
+
+def _check_configurations(start: Sequence[int], target: Sequence[int]) -> None:
+    """
+    Validate a pair of configurations given as the index of the peg of each disk.
+
+    Args:
+        start (Sequence[int]): The peg of each disk in the initial configuration.
+        target (Sequence[int]): The peg of each disk in the final configuration.
+
+    Raises:
+        ValueError: If the configurations have different lengths or use unknown pegs.
+    """
+    if len(start) != len(target):
+        raise ValueError("The configurations must have the same number of disks")
+    if not set(start) <= {0, 1, 2} or not set(target) <= {0, 1, 2}:
+        raise ValueError("Pegs must be identified by 0, 1 or 2")
+
+
+def _gather_cost(positions: Sequence[int], n_disks: int, peg: int) -> int:
+    """
+    Count the moves needed to gather the `n_disks` smallest disks into a tower on a peg.
+
+    Args:
+        positions (Sequence[int]): The peg of each disk, the smallest disk first.
+        n_disks (int): The number of smallest disks to gather.
+        peg (int): The index of the peg of the tower.
+
+    Returns:
+        int: The minimal number of moves.
+    """
+    cost = 0
+    for disk in range(n_disks, 0, -1):
+        if positions[disk - 1] != peg:
+            # Disk goes over directly, the smaller ones are first stacked on the third peg
+            cost += 1 << (disk - 1)
+            peg = 3 - peg - positions[disk - 1]
+    return cost
+
+
+def _gather(
+    positions: Sequence[int], n_disks: int, peg: int
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Generate the moves that gather the `n_disks` smallest disks into a tower on a peg.
+
+    Args:
+        positions (Sequence[int]): The peg of each disk, the smallest disk first.
+        n_disks (int): The number of smallest disks to gather.
+        peg (int): The index of the peg of the tower.
+
+    Yields:
+        Tuple[int, int, int]: The moved disk and the indices of the pegs it is moved
+                              from and to.
+    """
+    # Peg on which the disks smaller than each disk have to be stacked first
+    towers = [0] * (n_disks + 1)
+    towers[n_disks] = peg
+    for disk in range(n_disks, 0, -1):
+        current = positions[disk - 1]
+        towers[disk - 1] = peg if current == peg else 3 - peg - current
+        peg = towers[disk - 1]
+
+    # Build the tower from the smallest disk up
+    for disk in range(1, n_disks + 1):
+        current, peg = positions[disk - 1], towers[disk]
+        if current != peg:
+            yield disk, current, peg
+            yield from _tower(disk - 1, towers[disk - 1], peg)
+
+
+def _disperse(
+    positions: Sequence[int], n_disks: int, peg: int
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Generate the moves that spread a tower of the `n_disks` smallest disks on a peg into
+    a configuration.
+
+    Args:
+        positions (Sequence[int]): The peg of each disk in the configuration to reach.
+        n_disks (int): The number of smallest disks in the tower.
+        peg (int): The index of the peg of the tower.
+
+    Yields:
+        Tuple[int, int, int]: The moved disk and the indices of the pegs it is moved
+                              from and to.
+    """
+    for disk in range(n_disks, 0, -1):
+        wanted = positions[disk - 1]
+        if wanted != peg:
+            other = 3 - peg - wanted
+            yield from _tower(disk - 1, peg, other)
+            yield disk, peg, wanted
+            peg = other
+
+
+def _tower(
+    n_disks: int, source: int, destination: int
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Generate the moves of a tower of the `n_disks` smallest disks between two pegs.
+
+    Args:
+        n_disks (int): The number of disks in the tower.
+        source (int): The index of the peg the tower is moved from.
+        destination (int): The index of the peg the tower is moved to.
+
+    Yields:
+        Tuple[int, int, int]: The moved disk and the indices of the pegs it is moved
+                              from and to.
+    """
+    order = (source, 3 - source - destination, destination)
+    for disk, move_from, move_to in iter_moves(n_disks):
+        yield disk, order[move_from], order[move_to]
+
+
+def _plan(start: Sequence[int], target: Sequence[int]) -> Tuple[int, bool, int]:
+    """
+    Choose how the largest disk that is not in place reaches its target peg.
+
+    The smaller disks either gather on the third peg while the disk moves directly, or
+    they gather on the target peg and the disk makes two moves via the third peg. The
+    second route is occasionally shorter when both configurations are arbitrary.
+
+    Args:
+        start (Sequence[int]): The peg of each disk in the initial configuration.
+        target (Sequence[int]): The peg of each disk in the final configuration.
+
+    Returns:
+        Tuple[int, bool, int]: The largest disk that is not in place (0 if there is none),
+                               whether it moves via the third peg, and the number of moves.
+    """
+    disk = len(start)
+    while disk and start[disk - 1] == target[disk - 1]:
+        disk -= 1
+    if not disk:
+        return 0, False, 0
+
+    source, destination = start[disk - 1], target[disk - 1]
+    other = 3 - source - destination
+
+    direct = (
+        _gather_cost(start, disk - 1, other) + 1 + _gather_cost(target, disk - 1, other)
+    )
+    detour = (
+        _gather_cost(start, disk - 1, destination)
+        + (1 << (disk - 1))
+        + 1
+        + _gather_cost(target, disk - 1, source)
+    )
+
+    return disk, detour < direct, min(direct, detour)
+
+
+def count_moves_between(start: Sequence[int], target: Sequence[int]) -> int:
+    """
+    Compute the length of the shortest move sequence between two configurations in O(n).
+
+    Args:
+        start (Sequence[int]): The peg of each disk in the initial configuration, the
+                               smallest disk first.
+        target (Sequence[int]): The peg of each disk in the final configuration, the
+                                smallest disk first.
+
+    Returns:
+        int: The minimal number of moves.
+
+    Raises:
+        ValueError: If the configurations are not compatible.
+    """
+    _check_configurations(start, target)
+    return _plan(start, target)[2]
+
+
+def iter_moves_between(
+    start: Sequence[int], target: Sequence[int]
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Lazily generate the shortest move sequence between two configurations.
+
+    Every assignment of disks to pegs is a legal configuration, since the disks of a peg
+    are always stacked by size. The disks larger than the largest misplaced disk never
+    move. The smaller ones are gathered into a tower out of its way, the disk moves, and
+    the tower is spread into the target configuration.
+
+    Args:
+        start (Sequence[int]): The peg of each disk in the initial configuration, the
+                               smallest disk first.
+        target (Sequence[int]): The peg of each disk in the final configuration, the
+                                smallest disk first.
+
+    Yields:
+        Tuple[int, int, int]: The moved disk and the indices of the pegs it is moved
+                              from and to.
+
+    Raises:
+        ValueError: If the configurations are not compatible.
+    """
+    _check_configurations(start, target)
+    disk, detour, _ = _plan(start, target)
+    if not disk:
+        return
+
+    source, destination = start[disk - 1], target[disk - 1]
+    other = 3 - source - destination
+
+    if detour:
+        yield from _gather(start, disk - 1, destination)
+        yield disk, source, other
+        yield from _tower(disk - 1, destination, source)
+        yield disk, other, destination
+        yield from _disperse(target, disk - 1, source)
+    else:
+        yield from _gather(start, disk - 1, other)
+        yield disk, source, destination
+        yield from _disperse(target, disk - 1, other)
@@ -0,0 +1,152 @@
+"""
+Module for generating the Towers of Hanoi solution in parallel.
+
+Every move of the optimal solution can be computed from its step index alone (see
+`iter_moves`), so the `2^n - 1` steps are split into contiguous ranges which are generated
+by a pool of worker processes. Each worker writes its range to a segment file, and the
+segments are concatenated in order into the log of the `Hanoi` instance.
+
+The ranges start right after a multiple of eight steps, so the segments of the binary
+move log (eight moves per three bytes) can be concatenated byte by byte.
+
+Functions:
+    - shard_ranges(n_disks, jobs): Splits the steps of the solution into contiguous ranges.
+    - write_segment(...): Writes the moves of a single range to a segment file.
+    - write_sharded(...): Generates the whole solution with a process pool.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+import shutil
+import tempfile
+from typing import List, Optional, TextIO, Tuple
+
+from src.moves import iter_moves
+from src.movelog import MoveLogWriter, encode_moves
+
+# Number of steps generated and written by a worker at once
+CHUNK_SIZE = 1 << 20
+
+
+def shard_ranges(n_disks: int, jobs: int) -> List[Tuple[int, int]]:
+    """
+    Split the steps of the solution into contiguous ranges of nearly equal size.
+
+    Args:
+        n_disks (int): The number of disks in the puzzle.
+        jobs (int): The number of ranges to create.
+
+    Returns:
+        List[Tuple[int, int]]: The (start, stop) step ranges, with `stop` exclusive. Every
+                               range but the last holds a multiple of eight steps.
+    """
+    total = (1 << n_disks) - 1
+    groups = (total + 7) // 8
+
+    ranges = []
+    for job in range(jobs):
+        start = 1 + 8 * (groups * job // jobs)
+        stop = min(1 + 8 * (groups * (job + 1) // jobs), total + 1)
+        if start < stop:
+            ranges.append((start, stop))
+
+    return ranges
+
+
+def write_segment(
+    n_disks: int,
+    start: int,
+    stop: int,
+    path: str,
+    log_format: str,
+    peg_names: Tuple[str, str, str],
+) -> int:
+    """
+    Write the moves of a single range of steps to a segment file.
+
+    Args:
+        n_disks (int): The number of disks in the puzzle.
+        start (int): The first step of the range (1-based).
+        stop (int): The step at which the range ends (exclusive).
+        path (str): The path of the segment file.
+        log_format (str): Either 'text', for "Move disk ..." lines, or 'binary', for
+                          packed moves in the body format of the binary move log.
+        peg_names (Tuple[str, str, str]): Names of the source, auxiliary and destination pegs.
+
+    Returns:
+        int: The number of moves written.
+    """
+    with open(path, "wb") as file:
+        # Chunks hold a multiple of eight steps, so packed chunks concatenate cleanly
+        for chunk_start in range(start, stop, CHUNK_SIZE):
+            chunk_stop = min(chunk_start + CHUNK_SIZE, stop)
+            moves = iter_moves(n_disks, chunk_start, chunk_stop)
+
+            if log_format == "binary":
+                file.write(encode_moves((source, target) for _, source, target in moves))
+            else:
+                lines = (
+                    f"Move disk {disk} from {peg_names[source]} to {peg_names[target]}\n"
+                    for disk, source, target in moves
+                )
+                file.write("".join(lines).encode("utf-8"))
+
+    return stop - start
+
+
+def write_sharded(
+    n_disks: int,
+    jobs: int,
+    log_file: TextIO,
+    move_log: Optional[MoveLogWriter],
+    peg_names: Tuple[str, str, str],
+) -> int:
+    """
+    Generate the whole solution with a process pool and concatenate the segments in order.
+
+    Args:
+        n_disks (int): The number of disks in the puzzle.
+        jobs (int): The number of worker processes.
+        log_file (TextIO): The text log, which receives the moves if `move_log` is None.
+        move_log (MoveLogWriter or None): The binary move log, if the moves are logged in
+                                          the binary format.
+        peg_names (Tuple[str, str, str]): Names of the source, auxiliary and destination pegs.
+
+    Returns:
+        int: The total number of moves written.
+    """
+    log_format = "text" if move_log is None else "binary"
+    ranges = shard_ranges(n_disks, jobs)
+
+    # Segments are written next to the log so that concatenation stays on the same disk
+    log_folder_path = os.path.dirname(os.path.abspath(log_file.name))
+
+    with tempfile.TemporaryDirectory(dir=log_folder_path) as segment_folder_path:
+        paths = [
+            os.path.join(segment_folder_path, f"segment_{idx}")
+            for idx in range(len(ranges))
+        ]
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(
+                    write_segment, n_disks, start, stop, path, log_format, peg_names
+                )
+                for (start, stop), path in zip(ranges, paths)
+            ]
+
+            # Segments are appended in step order as soon as each of them is finished
+            step_count = 0
+            log_file.flush()
+            for future, path in zip(futures, paths):
+                move_count = future.result()
+                with open(path, "rb") as segment:
+                    if move_log is not None:
+                        move_log.extend(segment, move_count)
+                    else:
+                        shutil.copyfileobj(segment, log_file.buffer)
+                        log_file.buffer.flush()
+                step_count += move_count
+                os.remove(path)
+
+    return step_count
@@ -0,0 +1,141 @@
+"""
+Module for validating Towers of Hanoi move sequences produced by other systems.
+
+The moves are streamed from a text log ("Move disk ..." lines, every other line is
+ignored) or from a binary move log (see `src.movelog`) and replayed on three bitmasks, one
+per peg, in which bit `d - 1` is set if disk `d` is on the peg. The top disk of a peg is
+the lowest set bit of its mask, so every legality check is a couple of integer operations
+and the memory use does not depend on the length of the sequence.
+
+Functions:
+    - validate_moves(n_disks, moves): Validates a stream of moves.
+    - validate_text_log(path, n_disks, peg_names): Validates the moves of a text log.
+    - validate_binary_log(path): Validates the moves of a binary move log.
+"""
+
+from typing import Iterable, NamedTuple, Sequence, Tuple
+
+from src.movelog import PAIRS, iter_log_codes, read_header
+
+
+class ValidationResult(NamedTuple):
+    """
+    Outcome of the validation of a legal move sequence.
+
+    Attributes:
+        move_count (int): The number of moves in the sequence.
+        solved (bool): Whether every disk ends up on the destination peg.
+        optimal (bool): Whether the puzzle is solved with the minimal `2^n - 1` moves.
+    """
+
+    move_count: int
+    solved: bool
+    optimal: bool
+
+
+def validate_moves(
+    n_disks: int, moves: Iterable[Tuple[int, int, int]]
+) -> ValidationResult:
+    """
+    Replay a stream of moves from the initial state and check that each of them is legal.
+
+    Args:
+        n_disks (int): The number of disks in the puzzle.
+        moves (Iterable[Tuple[int, int, int]]): The moved disk and the indices of the pegs
+            it is moved from and to. A disk of 0 stands for the top disk of the source peg,
+            for formats that do not store the disk.
+
+    Returns:
+        ValidationResult: The number of moves and whether they solve the puzzle optimally.
+
+    Raises:
+        ValueError: If a move is illegal: an unknown peg, an empty source peg, a disk that
+                    is not on top of its peg, or a larger disk on a smaller one.
+    """
+    full = (1 << n_disks) - 1
+    masks = [full, 0, 0]
+    step = 0
+
+    for step, (disk, source, destination) in enumerate(moves, 1):
+        if not (0 <= source <= 2 and 0 <= destination <= 2) or source == destination:
+            raise ValueError(f"Step {step}: invalid pegs {source} -> {destination}")
+
+        source_mask = masks[source]
+        if not source_mask:
+            raise ValueError(f"Step {step}: source peg {source} is empty")
+
+        # The top disk of a peg is its smallest disk, i.e. the lowest set bit
+        top = source_mask & -source_mask
+        if disk and top != 1 << (disk - 1):
+            raise ValueError(f"Step {step}: disk {disk} is not on top of peg {source}")
+
+        destination_mask = masks[destination]
+        destination_top = destination_mask & -destination_mask
+        if destination_top and destination_top < top:
+            raise ValueError(
+                f"Step {step}: disk {top.bit_length()} cannot be placed on a smaller disk"
+            )
+
+        masks[source] = source_mask ^ top
+        masks[destination] = destination_mask | top
+
+    solved = masks[2] == full
+    return ValidationResult(step, solved, solved and step == full)
+
+
+def validate_text_log(
+    path: str, n_disks: int, peg_names: Sequence[str] = ("A", "B", "C")
+) -> ValidationResult:
+    """
+    Validate the moves of a text log.
+
+    Args:
+        path (str): The path of the text log.
+        n_disks (int): The number of disks in the puzzle.
+        peg_names (Sequence[str], optional): The names of the source, auxiliary and
+            destination pegs. Defaults to ('A', 'B', 'C').
+
+    Returns:
+        ValidationResult: The number of moves and whether they solve the puzzle optimally.
+
+    Raises:
+        ValueError: If a move is illegal or names an unknown peg.
+    """
+    pegs = {name: idx for idx, name in enumerate(peg_names)}
+
+    def moves():
+        with open(path, "r") as file:
+            for line in file:
+                if not line.startswith("Move disk "):
+                    continue
+                # Move disk <disk> from <source> to <destination>
+                _, _, disk, _, source, _, destination = line.split()
+                yield int(disk), pegs.get(source, -1), pegs.get(destination, -1)
+
+    return validate_moves(n_disks, moves())
+
+
+def validate_binary_log(path: str) -> ValidationResult:
+    """
+    Validate the moves of a binary move log.
+
+    The disk of a binary move is implied by the step index only for optimal sequences,
+    so the top disk of the source peg is checked instead.
+
+    Args:
+        path (str): The path of the binary move log.
+
+    Returns:
+        ValidationResult: The number of moves and whether they solve the puzzle optimally.
+
+    Raises:
+        ValueError: If a move is illegal or holds an unused peg-pair code.
+    """
+    with open(path, "rb") as file:
+        n_disks, _, _ = read_header(file)
+
+    # Unused codes map to invalid pegs, which `validate_moves` rejects
+    pairs = [(0, source, destination) for source, destination in PAIRS]
+    pairs += [(0, -1, -1)] * (8 - len(pairs))
+
+    return validate_moves(n_disks, (pairs[code] for code in iter_log_codes(path)))
@@ -0,0 +1,86 @@
+"""
+Validator for Towers of Hanoi move sequences.
+
+This script checks that a move sequence, given as a text log or as a binary move log,
+only contains legal moves, and reports whether it solves the puzzle with the minimal
+number of moves.
+
+Usage:
+    - Provide the path of the log (`--log_path`); binary logs are recognized by their header.
+    - Text logs also need the number of disks (`--n_disks`).
+"""
+
+from argparse import ArgumentParser
+import time
+
+from src.movelog import MAGIC
+from src.validator import validate_binary_log, validate_text_log
+
+
+def main(**kwargs) -> bool:
+    """
+    Validate a move sequence and print the outcome.
+
+    Args:
+        kwargs (dict): Dictionary of arguments that may include:
+            - log_path (str): Path of the text or binary log.
+            - n_disks (int): The number of disks, required for text logs.
+
+    Returns:
+        bool: True if the sequence is legal and solves the puzzle optimally.
+    """
+    log_path = kwargs.get("log_path")
+
+    with open(log_path, "rb") as file:
+        binary = file.read(len(MAGIC)) == MAGIC
+
+    start_time = time.perf_counter()
+
+    try:
+        if binary:
+            result = validate_binary_log(path=log_path)
+        else:
+            if kwargs.get("n_disks") is None:
+                raise ValueError("The number of disks is needed for text logs")
+            result = validate_text_log(path=log_path, n_disks=kwargs.get("n_disks"))
+    except ValueError as error:
+        print(f"Invalid move sequence: {error}")
+        return False
+
+    time_elapsed = time.perf_counter() - start_time
+
+    print(
+        f"Moves: {result.move_count}\nSolved: {result.solved}\nOptimal: {result.optimal}\nTime elapsed: {time_elapsed} seconds"
+    )
+    return result.optimal
+
+
+if __name__ == "__main__":
+    # Create an ArgumentParser object for handling command-line arguments
+    parser = ArgumentParser(description="Validate a Towers of Hanoi move sequence.")
+
+    # Path of the log to validate
+    parser.add_argument(
+        "--log_path",
+        type=str,
+        required=True,
+        help="Path of the text or binary move log.",
+    )
+
+    # Number of disks, binary logs store it in their header
+    parser.add_argument(
+        "--n_disks",
+        type=int,
+        required=False,
+        default=None,
+        help="The number of disks in the puzzle (required for text logs).",
+    )
+
+    # Parse the command-line arguments
+    args = parser.parse_args()
+
+    # Call the main function with the parsed arguments
+    main(
+        log_path=args.log_path,
+        n_disks=args.n_disks,
+    )
@@ -0,0 +1,94 @@
+"""
+Script to benchmark the sliding window median engines against each other.
+
+Every engine of `src.engines` is timed on the same random arrays for a grid of array sizes
+and window sizes, and the fastest one is reported per cell. The thresholds used by
+`select_engine` to pick the default engine come from this benchmark.
+
+Functions:
+    - benchmark(sizes, windows, repeat, seed): Times every engine on every cell of the grid.
+    - Argument parser for command-line execution of the script.
+"""
+
+from argparse import ArgumentParser
+import random
+import time
+from typing import Dict, List, Tuple
+
+from src.tools import ENGINES, available_engines
+
+
+def benchmark(
+    sizes: List[int], windows: List[int], repeat: int = 3, seed: int = 0
+) -> Dict[Tuple[int, int], Dict[str, float]]:
+    """
+    Time every available engine on random arrays for every array and window size.
+
+    Args:
+        sizes (List[int]): The array sizes n.
+        windows (List[int]): The window sizes k; the ones larger than n are skipped.
+        repeat (int, optional): The number of runs per engine, the best one is kept.
+                                Defaults to 3.
+        seed (int, optional): The seed of the random arrays. Defaults to 0.
+
+    Returns:
+        Dict[Tuple[int, int], Dict[str, float]]: The best time in seconds of each engine,
+                                                 keyed by (n, k).
+    """
+    rng = random.Random(seed)
+    engines = available_engines()
+    results = {}
+
+    for n in sizes:
+        # Values in the range of the problem constraints
+        arr = [rng.randint(1, 10**9) for _ in range(n)]
+
+        for k in windows:
+            if k > n:
+                continue
+
+            timings = {}
+            for name in engines:
+                best = float("inf")
+                for _ in range(repeat):
+                    start_time = time.perf_counter()
+                    ENGINES[name](arr, k)
+                    best = min(best, time.perf_counter() - start_time)
+                timings[name] = best
+
+            results[(n, k)] = timings
+
+            cells = "  ".join(f"{name}: {timings[name]:.4f}s" for name in engines)
+            print(f"n={n:<8} k={k:<8} {cells}  fastest: {min(timings, key=timings.get)}")
+
+    return results
+
+
+if __name__ == "__main__":
+    # Create an argument parser to handle command-line inputs
+    parser = ArgumentParser(description="Benchmark the sliding window median engines.")
+
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 20000, 200000],
+        help="Array sizes to benchmark.",
+    )
+
+    parser.add_argument(
+        "--windows",
+        type=int,
+        nargs="+",
+        default=[1, 3, 8, 16, 32, 64, 256, 4096, 100000],
+        help="Window sizes to benchmark.",
+    )
+
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Number of runs per engine and cell."
+    )
+
+    # Parse the command-line arguments
+    args = parser.parse_args()
+
+    benchmark(sizes=args.sizes, windows=args.windows, repeat=args.repeat)
@@ -0,0 +1,54 @@
+"""
+Converter from the CSV test files of the sliding window median to the binary container.
+
+The container (see `src.container`) stores every case as raw integers behind a small
+header, so `main.py` can memory-map the arrays instead of parsing them on every run.
+
+Usage:
+    - Provide the path of the CSV test file (`--csv_path`).
+    - Provide the path of the container to create (`--output_path`).
+"""
+
+from argparse import ArgumentParser
+
+from src.container import convert_csv
+
+
+def main(**kwargs) -> None:
+    """
+    Convert a CSV test file to a binary container.
+
+    Args:
+        kwargs (dict): Dictionary of arguments that may include:
+            - csv_path (str): Path of the CSV test file.
+            - output_path (str): Path of the container to create.
+    """
+    count = convert_csv(
+        csv_path=kwargs.get("csv_path"), output_path=kwargs.get("output_path")
+    )
+    print(f"Converted {count} cases to {kwargs.get('output_path')}")
+
+
+if __name__ == "__main__":
+    # Create an ArgumentParser object for handling command-line arguments
+    parser = ArgumentParser(
+        description="Convert a sliding window median test file to a binary container."
+    )
+
+    # Path of the CSV test file to convert
+    parser.add_argument(
+        "--csv_path", type=str, required=True, help="Path of the CSV test file."
+    )
+
+    # Path of the binary container to create
+    parser.add_argument(
+        "--output_path",
+        type=str,
+        required=True,
+        help="Path of the binary container to create.",
+    )
+
+    # Parse the command-line arguments
+    args = parser.parse_args()
+
+    main(csv_path=args.csv_path, output_path=args.output_path)
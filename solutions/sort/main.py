@@ -1,20 +1,50 @@
 """
 Module to execute the sliding window median algorithm on multiple test cases.
 
-This script takes a path to a file containing multiple test cases as input and
+This script takes a path to a file containing multiple test cases (in the CSV layout or
+as a binary container written by `convert.py`) as input and
 computes the sliding window medians for each test case. The test data is loaded
 from the file, and the results are printed after processing each case. The user
 can proceed to the next test case by pressing "Enter" after each result.
 
+With `--quantiles` every window gets a row of the requested quantiles (e.g. 0.5 0.9 0.99)
+instead of its median. The quantiles always come from the order-statistic window, so
+they cannot be combined with `--engine` or `--jobs`.
+
+With `--series_path` and `--window` a single series is streamed from its file in chunks
+instead, and each median is printed as soon as its window is full.
+
 Functions:
     - main(**kwargs): Main function that runs the sliding window median algorithm on multiple test cases.
+    - stream(series_path, k): Prints the sliding window medians of a streamed series.
     - Argument parser for command-line execution of the script.
 """
 
 from argparse import ArgumentParser
 from typing import List
 
-from src.tools import sliding_window_median, load_data
+from src.container import load_cases
+from src.streaming import SlidingMedian
+from src.tools import (
+    ENGINES,
+    iter_values,
+    sliding_window_median,
+    sliding_window_quantiles,
+)
+
+
+def stream(series_path: str, k: int) -> None:
+    """
+    Print the sliding window medians of a series read from its file in chunks.
+
+    Only the window is held in memory, so the series can be of any length.
+
+    Args:
+        series_path (str): The path to the file with the integers of the series.
+        k (int): The size of the sliding window.
+    """
+    for median in SlidingMedian(k).extend(iter_values(series_path)):
+        print(median)
 
 
 def main(**kwargs) -> List[int]:
@@ -24,9 +54,13 @@ def main(**kwargs) -> List[int]:
     Args:
         **kwargs: Arbitrary keyword arguments. Expected to include:
             - "test_path" (str): The path to the file containing test cases.
+            - "engine" (str, optional): The engine maintaining the window, "auto" by default.
+            - "jobs" (int, optional): The number of worker processes, 1 by default.
+            - "quantiles" (List[float], optional): Quantiles to compute per window instead
+              of the median.
 
     Processes each test case from the file:
-        - Loads the test cases using `load_data`.
+        - Loads the test cases using `load_cases`, from a CSV file or a binary container.
         - For each test case, computes the sliding window median using `sliding_window_median`.
         - Prints the results and waits for user input before moving to the next test case (except for the last one).
 
@@ -36,16 +70,35 @@ def main(**kwargs) -> List[int]:
     """
 
     # Load test cases from the file specified in kwargs
-    test_cases = load_data(path=kwargs.get("test_path"))
+    test_cases = load_cases(path=kwargs.get("test_path"))
 
     # Iterate over each test case and process it
     for idx, test_case in enumerate(test_cases):
         # Unpack the test case: n, k, arr
-        result = sliding_window_median(n=test_case[0], k=test_case[1], arr=test_case[2])
-
-        # Print the result for the current test case
+        if kwargs.get("quantiles"):
+            # One row of quantiles per window, from a single order-statistic window
+            result = sliding_window_quantiles(
+                n=test_case[0],
+                k=test_case[1],
+                arr=test_case[2],
+                quantiles=kwargs["quantiles"],
+            )
+        else:
+            result = sliding_window_median(
+                n=test_case[0],
+                k=test_case[1],
+                arr=test_case[2],
+                engine=kwargs.get("engine", "auto"),
+                jobs=kwargs.get("jobs", 1),
+            )
+
+        # Print the result for the current test case, labelled by what was computed
+        if kwargs.get("quantiles"):
+            label = f"Sliding window quantiles q={kwargs['quantiles']}"
+        else:
+            label = "Sliding window medians"
         print(
-            f"Sliding window medians with window size: {test_case[1]} for array: {test_case[2]}\n{result}"
+            f"{label} with window size: {test_case[1]} for array: {test_case[2].tolist()}\n{result}"
         )
 
         # Wait for user input to continue to the next test case (except for the last case)
@@ -61,12 +114,63 @@ if __name__ == "__main__":
     parser.add_argument(
         "--test_path",
         type=str,
-        required=True,
-        help="Path to the CSV containing the test data",
+        help="Path to the CSV or binary container with the test data",
+    )
+
+    # Define the argument for splitting the windows between worker processes
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes computing the medians",
+    )
+
+    # Define the argument for computing quantiles instead of the median
+    parser.add_argument(
+        "--quantiles",
+        type=float,
+        nargs="+",
+        help="Quantiles between 0 and 1 to compute for each window, e.g. 0.5 0.9 0.99",
+    )
+
+    # Define the arguments for streaming a single series instead
+    parser.add_argument(
+        "--series_path",
+        type=str,
+        help="Path to a file with a single series to stream",
+    )
+
+    parser.add_argument(
+        "--window", type=int, help="Size of the sliding window of the streamed series"
+    )
+
+    # Define the argument for forcing an engine instead of the automatic selection
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default="auto",
+        choices=["auto", *ENGINES],
+        help="Engine maintaining the sliding window",
     )
 
     # Parse the command-line arguments
     args = parser.parse_args()
 
-    # Execute the main function with the parsed arguments
-    main(test_path=args.test_path)
+    if (args.test_path is None) == (args.series_path is None):
+        parser.error("Give either --test_path or --series_path")
+    if args.series_path is not None and args.window is None:
+        parser.error("--series_path requires --window")
+    if args.quantiles and (args.engine != "auto" or args.jobs != 1):
+        parser.error("--quantiles cannot be combined with --engine or --jobs")
+
+    if args.series_path is not None:
+        # Stream the series with a window of the given size
+        stream(series_path=args.series_path, k=args.window)
+    else:
+        # Execute the main function with the parsed arguments
+        main(
+            test_path=args.test_path,
+            engine=args.engine,
+            jobs=args.jobs,
+            quantiles=args.quantiles,
+        )
@@ -0,0 +1,145 @@
+"""
+Module to calculate the sliding window medians of many equal-length series at once.
+
+The series are the rows of a 2-D array and every operation is vectorized across them, so
+there is no Python loop per series. Two methods are available:
+
+    - partition: every window of every series is a strided view, and the medians are
+      selected with `np.partition` over blocks of windows. It does O(k) work per window.
+    - fenwick: each series counts its window in a Fenwick tree over its sorted values, as
+      the `fenwick` engine does, and the trees of all series are updated and searched
+      together. The Python loop runs over the steps and the O(log n) tree levels only, so
+      the cost of a step does not depend on `k`.
+
+Functions:
+    - batch_sliding_median(data, k, method): Returns the medians of every series.
+"""
+
+import numpy as np
+
+from src.engines import BLOCK_ELEMENTS, median_rank
+
+# Largest window for which the partition method beats the Fenwick trees: on 1000 series
+# of 2000 to 5000 values, partitioning wins up to k = 301 and loses from k = 1001
+PARTITION_MAX_WINDOW = 512
+
+
+def _partition_medians(data: np.ndarray, k: int) -> np.ndarray:
+    """
+    Select the medians of the strided windows of every series with `np.partition`.
+
+    Args:
+        data (np.ndarray): The (series, n) array.
+        k (int): The size of the window.
+
+    Returns:
+        np.ndarray: The (series, n - k + 1) array of medians.
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(data, k, axis=1)
+    series, count, _ = windows.shape
+    rank = median_rank(k)
+    medians = np.empty((series, count), dtype=data.dtype)
+
+    # Blocks of windows of every series, to bound the memory of the partitioned copies
+    step = max(1, BLOCK_ELEMENTS // (series * k))
+    for start in range(0, count, step):
+        block = np.partition(windows[:, start : start + step], rank, axis=2)
+        medians[:, start : start + step] = block[:, :, rank]
+
+    return medians
+
+
+def _fenwick_medians(data: np.ndarray, k: int) -> np.ndarray:
+    """
+    Count the window of every series in a Fenwick tree over the positions of its values in
+    the sorted series, and select the medians by binary lifting. Each tree operation is a
+    loop over the O(log n) levels, with every level vectorized across the series.
+
+    Args:
+        data (np.ndarray): The (series, n) array.
+        k (int): The size of the window.
+
+    Returns:
+        np.ndarray: The (series, n - k + 1) array of medians.
+    """
+    series, n = data.shape
+    rank = median_rank(k)
+    rows = np.arange(series)
+    levels = n.bit_length()
+
+    # 1-based position of each element in its sorted series, equal values told apart
+    order = np.argsort(data, axis=1, kind="stable")
+    ordered = np.take_along_axis(data, order, axis=1)
+    positions = np.empty((series, n), dtype=np.intp)
+    positions[rows[:, None], order] = np.arange(1, n + 1)
+
+    # The extra last column absorbs the updates that run past the end of a tree
+    tree = np.zeros((series, n + 2), dtype=np.int32)
+    tree[rows[:, None], positions[:, :k]] = 1
+    for pos in range(1, n + 1):
+        parent = pos + (pos & -pos)
+        if parent <= n:
+            tree[:, parent] += tree[:, pos]
+
+    def add(pos: np.ndarray, delta: int) -> None:
+        for _ in range(levels):
+            tree[rows, pos] += delta
+            pos = np.minimum(pos + (pos & -pos), n + 1)
+
+    def select() -> np.ndarray:
+        pos = np.zeros(series, dtype=np.intp)
+        remaining = np.full(series, rank)
+        bit = 1 << (levels - 1)
+        while bit:
+            nxt = np.minimum(pos + bit, n + 1)
+            counts = tree[rows, nxt]
+            take = (nxt <= n) & (counts <= remaining)
+            pos = np.where(take, nxt, pos)
+            remaining -= np.where(take, counts, 0)
+            bit >>= 1
+        return ordered[rows, pos]
+
+    medians = np.empty((series, n - k + 1), dtype=data.dtype)
+    medians[:, 0] = select()
+
+    for idx in range(k, n):
+        add(positions[:, idx - k], -1)
+        add(positions[:, idx], 1)
+        medians[:, idx - k + 1] = select()
+
+    return medians
+
+
+def batch_sliding_median(data: np.ndarray, k: int, method: str = "auto") -> np.ndarray:
+    """
+    Calculate the sliding window medians of many equal-length series at once.
+
+    Args:
+        data (np.ndarray): The (series, n) array of integers, one series per row.
+        k (int): The size of the sliding window, shared by every series.
+        method (str, optional): Either 'partition', 'fenwick', or 'auto' to pick the
+                                partition method for windows up to `PARTITION_MAX_WINDOW`.
+                                Defaults to 'auto'.
+
+    Returns:
+        np.ndarray: The (series, n - k + 1) array of medians, the smaller of the two middle
+                    values for an even `k`.
+
+    Raises:
+        ValueError: If the array is not 2-D, if the sizes do not satisfy 1 <= k <= n, or
+                    if the method is unknown.
+    """
+    data = np.asarray(data)
+    if data.ndim != 2:
+        raise ValueError("The series must be the rows of a 2-D array")
+    if not 1 <= k <= data.shape[1]:
+        raise ValueError("The sizes must satisfy 1 <= k <= n")
+
+    if method == "auto":
+        method = "partition" if k <= PARTITION_MAX_WINDOW else "fenwick"
+
+    if method == "partition":
+        return _partition_medians(data, k)
+    if method == "fenwick":
+        return _fenwick_medians(data, k)
+    raise ValueError(f"Unknown method '{method}', expected 'partition' or 'fenwick'")
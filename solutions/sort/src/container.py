@@ -0,0 +1,178 @@
+"""
+Module for the compact binary container of sliding window median inputs.
+
+The CSV layout of the test files has to be parsed before every run. The binary container
+stores the same cases as raw little-endian integers behind small fixed-size headers, so a
+case is read back as a NumPy array memory-mapped on the file: nothing is parsed or copied
+until the values are used.
+
+Layout (little-endian, every section aligned on 8 bytes):
+    - magic (4 bytes): b"SWMD"
+    - version (uint8), 3 bytes of padding
+    - number of cases (uint32), 4 bytes of padding
+    - for each case:
+        - n (uint64), k (uint64)
+        - size of the integers in bytes (uint8, 4 or 8), 7 bytes of padding
+        - the n integers, padded with zeros to a multiple of 8 bytes
+
+Functions:
+    - write_cases(path, cases): Writes cases to a binary container.
+    - read_cases(path): Memory-maps the cases of a binary container.
+    - is_container(path): Tells whether a file is a binary container.
+    - convert_csv(csv_path, output_path): Converts a CSV test file to a binary container.
+    - load_cases(path): Loads the cases of a binary container or of a CSV test file.
+"""
+
+import struct
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from src.tools import load_arrays
+
+MAGIC = b"SWMD"
+VERSION = 1
+
+# File header: magic, version and number of cases
+HEADER = struct.Struct("<4sB3xI4x")
+
+# Case header: n, k and size of the integers
+CASE_HEADER = struct.Struct("<QQB7x")
+
+# Integer types by size, in the little-endian byte order of the container
+DTYPES = {4: np.dtype("<i4"), 8: np.dtype("<i8")}
+
+
+def write_cases(path: str, cases: Iterable[Tuple[int, int, np.ndarray]]) -> int:
+    """
+    Write cases to a binary container, each with the smallest integer type that holds it.
+
+    Args:
+        path (str): The path of the container to create.
+        cases (Iterable[Tuple[int, int, np.ndarray]]): The (n, k, arr) cases.
+
+    Returns:
+        int: The number of cases written.
+    """
+    count = 0
+
+    with open(path, "wb") as file:
+        # The number of cases is patched in once they are all written
+        file.write(HEADER.pack(MAGIC, VERSION, 0))
+
+        for n, k, arr in cases:
+            arr = np.asarray(arr)[:n]
+            int32 = np.iinfo(np.int32)
+            fits = not len(arr) or (arr.min() >= int32.min and arr.max() <= int32.max)
+            dtype = DTYPES[4 if fits else 8]
+
+            data = arr.astype(dtype).tobytes()
+            file.write(CASE_HEADER.pack(n, k, dtype.itemsize))
+            file.write(data + bytes(-len(data) % 8))
+            count += 1
+
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, count))
+
+    return count
+
+
+def read_cases(path: str) -> List[Tuple[int, int, np.ndarray]]:
+    """
+    Memory-map the cases of a binary container without reading their values.
+
+    Args:
+        path (str): The path of the container.
+
+    Returns:
+        List[Tuple[int, int, np.ndarray]]: The (n, k, arr) cases, with each `arr` a
+                                           read-only view on the file.
+
+    Raises:
+        ValueError: If the file is not a binary container of a supported version, if it
+                    is truncated, or if a case has an unsupported integer size.
+    """
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is not a sliding median container")
+
+        magic, version, count = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a sliding median container")
+        if version != VERSION:
+            raise ValueError(f"Unsupported container version {version}")
+
+        # Only the case headers are read; the arrays are mapped at their offsets
+        offsets = []
+        offset = HEADER.size
+        for _ in range(count):
+            file.seek(offset)
+            case_header = file.read(CASE_HEADER.size)
+            if len(case_header) < CASE_HEADER.size:
+                raise ValueError(f"{path} is truncated")
+
+            n, k, itemsize = CASE_HEADER.unpack(case_header)
+            if itemsize not in DTYPES:
+                raise ValueError(f"Unsupported integer size {itemsize} in {path}")
+            offset += CASE_HEADER.size
+            offsets.append((n, k, DTYPES[itemsize], offset))
+            offset += n * itemsize + (-n * itemsize) % 8
+
+        file.seek(0, 2)
+        if file.tell() < offset:
+            raise ValueError(f"{path} is truncated")
+
+    if not offsets:
+        return []
+
+    # A single map of the file, sliced into views of every case
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    return [
+        (n, k, data[start : start + n * dtype.itemsize].view(dtype))
+        for n, k, dtype, start in offsets
+    ]
+
+
+def is_container(path: str) -> bool:
+    """
+    Tell whether a file is a binary container, by its magic bytes.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        bool: True if the file starts with the magic of the container.
+    """
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def convert_csv(csv_path: str, output_path: str) -> int:
+    """
+    Convert a CSV test file (an "n, k" line followed by a line of n integers per case) to
+    a binary container.
+
+    Args:
+        csv_path (str): The path of the CSV test file.
+        output_path (str): The path of the container to create.
+
+    Returns:
+        int: The number of cases converted.
+    """
+    return write_cases(output_path, load_arrays(csv_path))
+
+
+def load_cases(path: str) -> List[Tuple[int, int, np.ndarray]]:
+    """
+    Load the cases of a test file, either a binary container or a CSV test file.
+
+    Args:
+        path (str): The path of the test file.
+
+    Returns:
+        List[Tuple[int, int, np.ndarray]]: The (n, k, arr) cases.
+    """
+    if is_container(path):
+        return read_cases(path)
+    return load_arrays(path)
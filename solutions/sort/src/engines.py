@@ -0,0 +1,352 @@
+"""
+Module with the interchangeable engines behind `sliding_window_median`.
+
+Every engine returns the median of each window of size `k`, i.e. the element of rank
+`(k - 1) // 2` of the sorted window (the smaller of the two middle elements for an even
+`k`), but they maintain the window differently:
+
+    - heaps: a max-heap of the lower half and a min-heap of the upper half. Elements
+      leaving the window are not searched for; they are dropped once they reach the top
+      of a heap (lazy deletion).
+    - fenwick: the values are compressed to their ranks and counted in a Fenwick tree; the
+      median is found by binary lifting over the tree in O(log n).
+    - numpy: every window is a strided view of the array and the median is selected with
+      `np.partition`, block by block. It does O(k) work per window, but in C, so it wins
+      for tiny windows.
+    - sorted: a `SortedList` from the optional `sortedcontainers` package.
+
+The Fenwick tree is also exposed as `OrderStatisticWindow`, which answers any number of
+rank queries per window, e.g. for `sliding_order_statistics`.
+
+Classes:
+    - OrderStatisticWindow(values): Multiset of compressed values with rank selection.
+
+`ENGINES` maps the engine names to their functions, and `select_engine` picks the fastest
+one for the sizes of an input, following the timings of `benchmark.py`.
+
+Functions:
+    - available_engines(): Returns the names of the engines that can run.
+    - select_engine(n, k): Returns the name of the fastest engine for the sizes.
+    - median_rank(k): Returns the rank of the median in a sorted window.
+    - sliding_order_statistics(arr, k, ranks): Several order statistics of each window.
+    - heaps_median(arr, k): Sliding median with two lazily pruned heaps.
+    - fenwick_median(arr, k): Sliding median with a coordinate-compressed Fenwick tree.
+    - numpy_median(arr, k): Sliding median with strided windows and `np.partition`.
+    - sorted_median(arr, k): Sliding median with a `SortedList`.
+"""
+
+from heapq import heappop, heappush
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:  # The sorted engine is only available with sortedcontainers
+    SortedList = None
+
+# Number of window elements partitioned at once by the NumPy engine
+BLOCK_ELEMENTS = 1 << 20
+
+
+class OrderStatisticWindow:
+    """
+    Multiset of values from a known universe, with the count of each compressed value kept
+    in a Fenwick tree, so that insertions, removals and rank selections are O(log n).
+
+    Attributes:
+        values (List[int]): The distinct values of the universe, in increasing order.
+        ranks (Dict[int, int]): The 1-based position of each value in `values`.
+        tree (List[int]): The Fenwick tree of the counts, indexed by position.
+    """
+
+    def __init__(self, values: Sequence[int]) -> None:
+        """
+        Initializes an empty multiset over the given values.
+
+        Args:
+            values (Sequence[int]): The values that may be inserted, duplicates allowed.
+        """
+        self.values = sorted(set(values))
+        self.ranks = {value: rank for rank, value in enumerate(self.values, 1)}
+        self.tree = [0] * (len(self.values) + 1)
+        self.__top_bit = 1 << (len(self.values).bit_length() - 1)
+
+    def add(self, pos: int, delta: int) -> None:
+        """
+        Change the count of a compressed value.
+
+        Args:
+            pos (int): The 1-based position of the value, as given by `ranks`.
+            delta (int): The change of its count, 1 to insert and -1 to remove.
+        """
+        tree = self.tree
+        size = len(tree) - 1
+        while pos <= size:
+            tree[pos] += delta
+            pos += pos & -pos
+
+    def insert(self, value: int) -> None:
+        """
+        Insert a value of the universe.
+
+        Args:
+            value (int): The value to insert.
+        """
+        self.add(self.ranks[value], 1)
+
+    def remove(self, value: int) -> None:
+        """
+        Remove one occurrence of a value of the multiset.
+
+        Args:
+            value (int): The value to remove.
+        """
+        self.add(self.ranks[value], -1)
+
+    def select(self, rank: int) -> int:
+        """
+        Return the value of a given rank by binary lifting over the tree: the largest
+        prefix whose count does not exceed the rank ends just before it.
+
+        Args:
+            rank (int): The 0-based rank in the sorted multiset.
+
+        Returns:
+            int: The value of that rank.
+        """
+        tree = self.tree
+        size = len(tree) - 1
+        pos = 0
+        bit = self.__top_bit
+        while bit:
+            nxt = pos + bit
+            if nxt <= size and tree[nxt] <= rank:
+                pos = nxt
+                rank -= tree[nxt]
+            bit >>= 1
+        return self.values[pos]
+
+
+def median_rank(k: int) -> int:
+    """
+    Return the rank of the median in a sorted window of size `k`.
+
+    Args:
+        k (int): The size of the window.
+
+    Returns:
+        int: The 0-based rank, the lower of the two middle ranks for an even `k`.
+    """
+    return (k - 1) // 2
+
+
+def heaps_median(arr: Sequence[int], k: int) -> List[int]:
+    """
+    Calculate the sliding window medians with two heaps and lazy deletion.
+
+    The lower heap holds the `median_rank(k) + 1` smallest elements of the window, so the
+    median is its top. Equal values are told apart by their index: each element is keyed
+    as `value * n + index`, which keeps a total order and makes the expired elements (an
+    index before the window) easy to recognize at the top of a heap.
+
+    Args:
+        arr (Sequence[int]): The integers of the array.
+        k (int): The size of the window.
+
+    Returns:
+        List[int]: The median of each window.
+    """
+    n = len(arr)
+    low_size = median_rank(k) + 1
+
+    # Max-heap of the lower half (negated keys) and min-heap of the upper half
+    keys = sorted(value * n + idx for idx, value in enumerate(arr[:k]))
+    low = [-key for key in reversed(keys[:low_size])]
+    high = keys[low_size:]
+
+    medians = [-low[0] // n]
+
+    for idx in range(k, n):
+        # Element leaving the window and element entering it
+        out_key = arr[idx - k] * n + idx - k
+        in_key = arr[idx] * n + idx
+
+        top = -low[0]
+        out_low = out_key <= top
+        in_low = in_key <= top
+
+        if in_low:
+            heappush(low, -in_key)
+        else:
+            heappush(high, in_key)
+
+        # Keep the size of the lower half when the two elements sit in different halves
+        if out_low and not in_low:
+            heappush(low, -heappop(high))
+        elif in_low and not out_low:
+            heappush(high, -heappop(low))
+
+        # Drop the expired elements that reached a top; the others wait there
+        first = idx - k + 1
+        while -low[0] % n < first:
+            heappop(low)
+        while high and high[0] % n < first:
+            heappop(high)
+
+        medians.append(-low[0] // n)
+
+    return medians
+
+
+def fenwick_median(arr: Sequence[int], k: int) -> List[int]:
+    """
+    Calculate the sliding window medians with a Fenwick tree over the compressed values.
+
+    Args:
+        arr (Sequence[int]): The integers of the array.
+        k (int): The size of the window.
+
+    Returns:
+        List[int]: The median of each window.
+    """
+    return [row[0] for row in sliding_order_statistics(arr, k, [median_rank(k)])]
+
+
+def sliding_order_statistics(
+    arr: Sequence[int], k: int, ranks: Sequence[int]
+) -> List[Tuple[int, ...]]:
+    """
+    Calculate several order statistics of each sliding window in one pass.
+
+    The window is a single `OrderStatisticWindow`: each step is one insertion, one removal
+    and one selection per rank.
+
+    Args:
+        arr (Sequence[int]): The integers of the array.
+        k (int): The size of the window.
+        ranks (Sequence[int]): The 0-based ranks to select in every sorted window.
+
+    Returns:
+        List[Tuple[int, ...]]: The values of the requested ranks for each window.
+
+    Raises:
+        ValueError: If a rank is outside the window.
+    """
+    if not all(0 <= rank < k for rank in ranks):
+        raise ValueError(f"The ranks must be between 0 and {k - 1}")
+
+    window = OrderStatisticWindow(arr)
+    positions = [window.ranks[value] for value in arr]
+    add, select = window.add, window.select
+
+    for pos in positions[:k]:
+        add(pos, 1)
+
+    rows = [tuple(select(rank) for rank in ranks)]
+    for idx in range(k, len(arr)):
+        add(positions[idx - k], -1)
+        add(positions[idx], 1)
+        rows.append(tuple(select(rank) for rank in ranks))
+
+    return rows
+
+
+def numpy_median(arr: Sequence[int], k: int) -> List[int]:
+    """
+    Calculate the sliding window medians with strided windows and `np.partition`.
+
+    The windows are views of the array, and they are partitioned in blocks of about
+    `BLOCK_ELEMENTS` elements to bound the memory of the partitioned copies.
+
+    Args:
+        arr (Sequence[int]): The integers of the array.
+        k (int): The size of the window.
+
+    Returns:
+        List[int]: The median of each window.
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(np.asarray(arr), k)
+    rank = median_rank(k)
+    medians = np.empty(len(windows), dtype=windows.dtype)
+
+    rows = max(1, BLOCK_ELEMENTS // k)
+    for start in range(0, len(windows), rows):
+        block = np.partition(windows[start : start + rows], rank, axis=1)
+        medians[start : start + rows] = block[:, rank]
+
+    return medians.tolist()
+
+
+def sorted_median(arr: Sequence[int], k: int) -> List[int]:
+    """
+    Calculate the sliding window medians with a `SortedList`.
+
+    Args:
+        arr (Sequence[int]): The integers of the array.
+        k (int): The size of the window.
+
+    Returns:
+        List[int]: The median of each window.
+
+    Raises:
+        ImportError: If sortedcontainers is not installed.
+    """
+    if SortedList is None:
+        raise ImportError("The sorted engine requires the sortedcontainers package")
+
+    window = SortedList(arr[:k])
+    rank = median_rank(k)
+
+    medians = [window[rank]]
+    for idx in range(k, len(arr)):
+        window.remove(arr[idx - k])
+        window.add(arr[idx])
+        medians.append(window[rank])
+
+    return medians
+
+
+# Engines by name, all with the signature engine(arr, k)
+ENGINES: Dict[str, Callable[[Sequence[int], int], List[int]]] = {
+    "heaps": heaps_median,
+    "fenwick": fenwick_median,
+    "numpy": numpy_median,
+    "sorted": sorted_median,
+}
+
+# Largest window for which partitioning every window beats maintaining it: in benchmark.py
+# the NumPy engine is the fastest up to k = 256 for every n, the heaps beyond
+NUMPY_MAX_WINDOW = 256
+
+
+def available_engines() -> List[str]:
+    """
+    Return the names of the engines whose dependencies are installed.
+
+    Returns:
+        List[str]: The engine names, as keys of `ENGINES`.
+    """
+    return [name for name in ENGINES if name != "sorted" or SortedList is not None]
+
+
+def select_engine(n: int, k: int) -> str:
+    """
+    Select the fastest engine for an array of size `n` and windows of size `k`.
+
+    Only `k` decides: both candidates do a fixed amount of work per window, O(k) for the
+    NumPy engine and O(log k) for the heaps, so `n` scales them alike and cancels out of
+    their ratio. In benchmark.py, for n from 2000 to 200000, the NumPy engine is 2 to 5
+    times faster up to k = 128, the two are within a few percent at k = 256, and the heaps
+    win at every n from k = 1024. `n` stays in the signature for the callers.
+
+    Args:
+        n (int): The size of the array, which does not change the selection.
+        k (int): The size of the sliding window.
+
+    Returns:
+        str: The name of the engine, as a key of `ENGINES`.
+    """
+    if k <= NUMPY_MAX_WINDOW:
+        return "numpy"
+    return "heaps"
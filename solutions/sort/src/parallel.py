@@ -0,0 +1,151 @@
+"""
+Module for calculating sliding window medians in parallel.
+
+The windows are split into contiguous ranges, one per worker process. The input chunk of a
+range holds its windows plus the `k - 1` elements they reach past its end, so neighbouring
+chunks overlap by `k - 1` elements and every worker is independent of the others.
+
+The array and the medians live in `multiprocessing.shared_memory` blocks as int64: the
+workers attach to them by name instead of receiving a pickled copy, and each one writes
+its medians straight into the output block at the offset of its first window.
+
+Functions:
+    - window_ranges(n, k, jobs): Splits the windows into contiguous ranges.
+    - median_chunk(...): Calculates the medians of a single range of windows.
+    - parallel_sliding_median(n, k, arr, jobs, engine): Calculates every median with a
+      process pool.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from src.engines import ENGINES, select_engine
+
+
+def window_ranges(n: int, k: int, jobs: int) -> List[Tuple[int, int]]:
+    """
+    Split the windows of the array into contiguous ranges of nearly equal size.
+
+    Args:
+        n (int): The size of the array.
+        k (int): The size of the sliding window.
+        jobs (int): The number of ranges to create.
+
+    Returns:
+        List[Tuple[int, int]]: The (start, stop) ranges of window indices, with `stop`
+                               exclusive. Window `i` covers the elements `i` to `i + k - 1`.
+    """
+    total = n - k + 1
+
+    ranges = []
+    for job in range(jobs):
+        start = total * job // jobs
+        stop = total * (job + 1) // jobs
+        if start < stop:
+            ranges.append((start, stop))
+
+    return ranges
+
+
+def median_chunk(
+    input_name: str, output_name: str, n: int, k: int, start: int, stop: int, engine: str
+) -> int:
+    """
+    Calculate the medians of a range of windows and write them to the shared output.
+
+    Args:
+        input_name (str): The name of the shared memory block of the int64 array.
+        output_name (str): The name of the shared memory block of the int64 medians.
+        n (int): The size of the array.
+        k (int): The size of the sliding window.
+        start (int): The index of the first window of the range.
+        stop (int): The index at which the range ends (exclusive).
+        engine (str): The engine maintaining the window, or "auto" to select the fastest
+                      one for the chunk.
+
+    Returns:
+        int: The number of medians written.
+    """
+    input_block = shared_memory.SharedMemory(name=input_name)
+    output_block = shared_memory.SharedMemory(name=output_name)
+
+    try:
+        arr = np.ndarray((n,), dtype=np.int64, buffer=input_block.buf)
+        medians = np.ndarray((n - k + 1,), dtype=np.int64, buffer=output_block.buf)
+
+        # The chunk overlaps the next one by the k - 1 elements of its last windows
+        chunk = arr[start : stop + k - 1]
+        if engine == "auto":
+            engine = select_engine(len(chunk), k)
+
+        # A list for the pure Python engines, as in `sliding_window_median`
+        medians[start:stop] = ENGINES[engine](
+            chunk if engine == "numpy" else chunk.tolist(), k
+        )
+
+        # The views must be released before the blocks are closed
+        del arr, medians, chunk
+    finally:
+        input_block.close()
+        output_block.close()
+
+    return stop - start
+
+
+def parallel_sliding_median(
+    n: int, k: int, arr: Sequence[int], jobs: int, engine: str = "auto"
+) -> List[int]:
+    """
+    Calculate the median of each sliding window with a pool of worker processes.
+
+    Args:
+        n (int): The size of the array.
+        k (int): The size of the sliding window.
+        arr (Sequence[int]): The integers of the array, which must fit in int64.
+        jobs (int): The number of worker processes.
+        engine (str, optional): The engine maintaining the window in each worker, or
+                                "auto" to select it per chunk. Defaults to "auto".
+
+    Returns:
+        List[int]: A list of medians, one for each sliding window.
+    """
+    itemsize = np.dtype(np.int64).itemsize
+    input_block = shared_memory.SharedMemory(create=True, size=n * itemsize)
+    output_block = shared_memory.SharedMemory(create=True, size=(n - k + 1) * itemsize)
+
+    try:
+        shared_arr = np.ndarray((n,), dtype=np.int64, buffer=input_block.buf)
+        shared_arr[:] = np.asarray(arr[:n], dtype=np.int64)
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(
+                    median_chunk,
+                    input_block.name,
+                    output_block.name,
+                    n,
+                    k,
+                    start,
+                    stop,
+                    engine,
+                )
+                for start, stop in window_ranges(n, k, jobs)
+            ]
+            for future in futures:
+                future.result()
+
+        medians = np.ndarray((n - k + 1,), dtype=np.int64, buffer=output_block.buf)
+        result = medians.tolist()
+
+        # The views must be released before the blocks are closed
+        del shared_arr, medians
+    finally:
+        input_block.close()
+        output_block.close()
+        input_block.unlink()
+        output_block.unlink()
+
+    return result
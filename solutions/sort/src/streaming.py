@@ -0,0 +1,431 @@
+"""
+Module to calculate sliding window medians over a stream of integers.
+
+The class `SlidingMedian` keeps the last `k` values of the stream and emits the median of
+the window as soon as it is full, one value at a time, so the series never has to be held
+in memory. `TimedSlidingMedian` does the same for timestamped events, with a window of
+the events of the last `duration` time units, whose size varies.
+
+Both are built on `MedianWindow`, which keeps the values of a window in arrival order as
+two heaps with lazy deletion, like the heaps engine of `src.engines`: appending a value and
+dropping the oldest one are O(log w) for a window of w values. The running sum of each
+half is kept as well, so the total distance of the values to the median (`cost`) is known
+in O(1) at every step. Since a stream has no known
+length, the elements are keyed by (value, index) pairs, and the heaps are compacted
+whenever the expired elements they still hold outnumber the window, which bounds the memory
+to O(w).
+
+Classes:
+    - MedianWindow(): Window of values in arrival order with its median.
+    - SlidingMedian(k): Sliding window median of a stream.
+    - TimedSlidingMedian(duration): Sliding median of the events of the last time units.
+
+Functions:
+    - time_window_medians(events, duration, tick): Medians of timestamped events, per
+      event or per tick.
+"""
+
+from collections import deque
+from heapq import heapify, heappop, heappush
+from typing import Iterable, Iterator, Optional, Tuple
+
+# Number of expired heap elements tolerated beyond the size of the window
+COMPACT_SLACK = 64
+
+
+class MedianWindow:
+    """
+    Window of integers in arrival order, with the median on top of the lower heap.
+
+    Attributes:
+        count (int): The number of values appended so far.
+        window (deque): The values of the window, the oldest one first.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty window.
+        """
+        self.count = 0
+        self.window = deque()
+
+        # Max-heap of the lower half, as negated (value, index) pairs, and min-heap of the
+        # upper half, with the number and sum of the elements of each that are still in the
+        # window
+        self.__low = []
+        self.__high = []
+        self.__low_size = 0
+        self.__high_size = 0
+        self.__low_sum = 0
+        self.__high_sum = 0
+
+    def __len__(self) -> int:
+        """
+        Return the number of values in the window.
+
+        Returns:
+            int: The number of values.
+        """
+        return len(self.window)
+
+    @property
+    def median(self) -> Optional[int]:
+        """
+        The median of the window, the smaller of the two middle values for an even size.
+
+        Returns:
+            Optional[int]: The median, or None if the window is empty.
+        """
+        if not self.window:
+            return None
+        return -self.__low[0][0]
+
+    @property
+    def cost(self) -> Optional[int]:
+        """
+        The sum of the distances |x - median| over the values x of the window, i.e. the
+        cost of moving every value to the median.
+
+        The values of the lower half are at most the median and the others at least, so
+        the cost is `median * |low| - sum(low) + sum(high) - median * |high|`.
+
+        Returns:
+            Optional[int]: The cost, or None when there is no median.
+        """
+        median = self.median
+        if median is None:
+            return None
+        return (
+            median * (self.__low_size - self.__high_size)
+            - self.__low_sum
+            + self.__high_sum
+        )
+
+    def append(self, x: int) -> None:
+        """
+        Add a value at the end of the window.
+
+        Args:
+            x (int): The new value.
+        """
+        self.__insert(x)
+        self.__balance()
+
+    def popleft(self) -> int:
+        """
+        Drop the oldest value of the window.
+
+        Returns:
+            int: The dropped value.
+
+        Raises:
+            IndexError: If the window is empty.
+        """
+        x = self.__remove_oldest()
+        self.__balance()
+        return x
+
+    def replace(self, x: int) -> int:
+        """
+        Drop the oldest value of the window and add a new one, with a single rebalancing
+        of the halves.
+
+        Args:
+            x (int): The new value.
+
+        Returns:
+            int: The dropped value.
+
+        Raises:
+            IndexError: If the window is empty.
+        """
+        old = self.__remove_oldest()
+        self.__insert(x)
+        self.__balance()
+        return old
+
+    def __insert(self, x: int) -> None:
+        """
+        Push a new value on the heap of its half, without rebalancing.
+
+        Args:
+            x (int): The new value.
+        """
+        idx = self.count
+        self.count += 1
+        window = self.window
+        window.append(x)
+
+        # The lower heap holds negated pairs, so its top is the smallest of them
+        low = self.__low
+        if low and (-x, -idx) >= low[0]:
+            heappush(low, (-x, -idx))
+            self.__low_size += 1
+            self.__low_sum += x
+        else:
+            heappush(self.__high, (x, idx))
+            self.__high_size += 1
+            self.__high_sum += x
+
+        # Expired elements only leave a heap at its top; drop the rest once they pile up
+        if len(low) + len(self.__high) > 2 * len(window) + COMPACT_SLACK:
+            self.__compact()
+
+    def __remove_oldest(self) -> int:
+        """
+        Drop the oldest value from the count of its half, without rebalancing.
+
+        Returns:
+            int: The dropped value.
+        """
+        # The tops are still valid, so the side of the leaving element is known
+        idx = self.count - len(self.window)
+        x = self.window.popleft()
+        if (-x, -idx) >= self.__low[0]:
+            self.__low_size -= 1
+            self.__low_sum -= x
+        else:
+            self.__high_size -= 1
+            self.__high_sum -= x
+
+        self.__prune()
+        return x
+
+    def __balance(self) -> None:
+        """
+        Move elements between the halves until the lower half holds the median on top.
+        """
+        # The lower half holds the ranks up to `median_rank`, i.e. half the window rounded up
+        target = (len(self.window) + 1) // 2
+
+        while self.__low_size > target:
+            value, idx = heappop(self.__low)
+            heappush(self.__high, (-value, -idx))
+            self.__low_size -= 1
+            self.__high_size += 1
+            self.__low_sum += value
+            self.__high_sum -= value
+            self.__prune()
+
+        while self.__low_size < target:
+            value, idx = heappop(self.__high)
+            heappush(self.__low, (-value, -idx))
+            self.__low_size += 1
+            self.__high_size -= 1
+            self.__low_sum += value
+            self.__high_sum -= value
+            self.__prune()
+
+    def __prune(self) -> None:
+        """
+        Drop the expired elements from the tops of both heaps.
+        """
+        first = self.count - len(self.window)
+        while self.__low and -self.__low[0][1] < first:
+            heappop(self.__low)
+        while self.__high and self.__high[0][1] < first:
+            heappop(self.__high)
+
+    def __compact(self) -> None:
+        """
+        Rebuild both heaps without their expired elements.
+        """
+        first = self.count - len(self.window)
+        self.__low = [pair for pair in self.__low if -pair[1] >= first]
+        self.__high = [pair for pair in self.__high if pair[1] >= first]
+        heapify(self.__low)
+        heapify(self.__high)
+
+
+class SlidingMedian(MedianWindow):
+    """
+    Sliding window median of a stream of integers.
+
+    Attributes:
+        k (int): The size of the window.
+        count (int): The number of values pushed so far.
+        window (deque): The values of the window, the oldest one first.
+    """
+
+    def __init__(self, k: int) -> None:
+        """
+        Initializes an empty window.
+
+        Args:
+            k (int): The size of the window.
+
+        Raises:
+            ValueError: If the size of the window is smaller than 1.
+        """
+        if k < 1:
+            raise ValueError("The window needs at least one element")
+
+        super().__init__()
+        self.k = k
+
+    @property
+    def median(self) -> Optional[int]:
+        """
+        The median of the window, the smaller of the two middle values for an even size.
+
+        Returns:
+            Optional[int]: The median, or None while the window is not full.
+        """
+        if self.count < self.k:
+            return None
+        return super().median
+
+    def push(self, x: int) -> Optional[int]:
+        """
+        Add a value to the window, dropping the oldest one once the window is full.
+
+        Args:
+            x (int): The new value of the stream.
+
+        Returns:
+            Optional[int]: The median of the window, or None while it is not full.
+        """
+        if len(self.window) < self.k:
+            self.append(x)
+        else:
+            self.replace(x)
+
+        return self.median
+
+    def extend(self, values: Iterable[int]) -> Iterator[int]:
+        """
+        Add the values of an iterable one by one and lazily generate the medians.
+
+        Args:
+            values (Iterable[int]): The new values of the stream.
+
+        Yields:
+            int: The median of the window after each value, once the window is full.
+        """
+        for x in values:
+            median = self.push(x)
+            if median is not None:
+                yield median
+
+
+class TimedSlidingMedian(MedianWindow):
+    """
+    Sliding median of the events of the last `duration` time units: at time t the window
+    holds the events with a timestamp in (t - duration, t].
+
+    Attributes:
+        duration (float): The length of the window in time units.
+        timestamps (deque): The timestamps of the events of the window, the oldest first.
+        now (float): The latest time reached, or None before the first event.
+    """
+
+    def __init__(self, duration: float) -> None:
+        """
+        Initializes an empty window.
+
+        Args:
+            duration (float): The length of the window in time units, e.g. seconds.
+
+        Raises:
+            ValueError: If the duration is not positive.
+        """
+        if duration <= 0:
+            raise ValueError("The duration of the window must be positive")
+
+        super().__init__()
+        self.duration = duration
+        self.timestamps = deque()
+        self.now = None
+
+    def advance(self, timestamp: float) -> Optional[int]:
+        """
+        Move the time forward and drop the events that are too old.
+
+        Args:
+            timestamp (float): The new time.
+
+        Returns:
+            Optional[int]: The median of the window, or None if it is empty.
+
+        Raises:
+            ValueError: If the time goes backwards.
+        """
+        if self.now is not None and timestamp < self.now:
+            raise ValueError(f"Timestamp {timestamp} is before {self.now}")
+        self.now = timestamp
+
+        horizon = timestamp - self.duration
+        while self.timestamps and self.timestamps[0] <= horizon:
+            self.timestamps.popleft()
+            self.popleft()
+
+        return self.median
+
+    def push(self, timestamp: float, value: int) -> int:
+        """
+        Add an event to the window, dropping the events that are too old.
+
+        Args:
+            timestamp (float): The time of the event, not before the previous one.
+            value (int): The value of the event.
+
+        Returns:
+            int: The median of the window, which holds at least the new event.
+
+        Raises:
+            ValueError: If the timestamp is before the previous one.
+        """
+        self.advance(timestamp)
+        self.timestamps.append(timestamp)
+        self.append(value)
+        return self.median
+
+
+def time_window_medians(
+    events: Iterable[Tuple[float, int]], duration: float, tick: Optional[float] = None
+) -> Iterator[Tuple[float, Optional[int]]]:
+    """
+    Lazily calculate the sliding medians of timestamped events over the last `duration`
+    time units, with O(log w) work per event for a window of w events.
+
+    Args:
+        events (Iterable[Tuple[float, int]]): The (timestamp, value) pairs, in
+            non-decreasing order of timestamp.
+        duration (float): The length of the window in time units.
+        tick (float, optional): The interval between reported medians, starting at the
+            first timestamp, until the last one is passed. Defaults to None, i.e. one
+            median after every event.
+
+    Yields:
+        Tuple[float, Optional[int]]: The time and the median of the window at that time,
+                                     None if it holds no event.
+
+    Raises:
+        ValueError: If the events are not in order of timestamp or if the tick is not
+                    positive.
+    """
+    window = TimedSlidingMedian(duration)
+
+    if tick is None:
+        for timestamp, value in events:
+            yield timestamp, window.push(timestamp, value)
+        return
+
+    if tick <= 0:
+        raise ValueError("The tick must be positive")
+
+    start = None
+    ticks = 0
+    for timestamp, value in events:
+        if start is None:
+            start = timestamp
+
+        # Report the ticks before this event; the ticks are counted to avoid drifting
+        while start + ticks * tick < timestamp:
+            yield start + ticks * tick, window.advance(start + ticks * tick)
+            ticks += 1
+
+        window.push(timestamp, value)
+
+    if start is not None:
+        yield start + ticks * tick, window.advance(start + ticks * tick)
@@ -3,23 +3,51 @@ Module to calculate the median of each sliding window of size k in an array.
 
 The function `sliding_window_median` computes the median of 
 each sliding window of size `k` over a given list of integers. 
-A `SortedList` from the `sortedcontainers` library is used 
-to maintain the elements in sorted order for efficient median calculation.
+The window is maintained by one of the engines of `src.engines` (two heaps with lazy
+deletion, a Fenwick tree over the compressed values, NumPy partitioning of strided windows
+or a `SortedList`); by default the fastest one for the sizes of the input is selected,
+following the timings of `benchmark.py`. With several jobs the windows are split between
+worker processes sharing the array (see `src.parallel`).
 
 Function:
-    - sliding_window_median(n, k, arr): Returns a list of medians f
+    - sliding_window_median(n, k, arr, engine): Returns a list of medians f
     or each sliding window of size `k` over the input array `arr`.
+    - sliding_window_quantiles(n, k, arr, quantiles): Returns several quantiles per window.
+    - sliding_time_median(events, duration, tick): Returns the medians of the last
+      `duration` time units of timestamped events.
+    - sliding_window_cost(n, k, arr): Returns the total distance to the median per window.
+    - sliding_window_median_batch(series, k, method): Returns the medians of many
+      equal-length series at once, vectorized across the series.
+    - iter_values(path, chunk_size): Lazily reads the integers of a series file in chunks.
+    - load_arrays(path): Loads the cases of a test file into NumPy arrays in bulk.
 
 Constraints:
     - 1 ≤ k ≤ n ≤ 2 * 10^5
     - 1 ≤ x_i ≤ 10^9
 """
 
-from sortedcontainers import SortedList
-from typing import List, Tuple
+from fractions import Fraction
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 
-def sliding_window_median(n, k, arr):
+from src.batch import batch_sliding_median
+from src.engines import (
+    ENGINES,
+    available_engines,
+    select_engine,
+    sliding_order_statistics,
+)
+from src.parallel import parallel_sliding_median
+from src.streaming import SlidingMedian, time_window_medians
+
+# Number of characters read at once from a streamed series
+CHUNK_SIZE = 1 << 20
+
+
+def sliding_window_median(
+    n: int, k: int, arr: Sequence[int], engine: str = "auto", jobs: int = 1
+) -> List[int]:
     """
     Calculate the median of each sliding window of size `k` in the array `arr`.
 
@@ -27,45 +55,186 @@ def sliding_window_median(n, k, arr):
         n (int): The size of the array.
         k (int): The size of the sliding window.
         arr (list of int): The list of integers representing the array.
+        engine (str, optional): The name of the engine maintaining the window, or "auto"
+                                to select the fastest one with `select_engine`. Defaults
+                                to "auto".
+        jobs (int, optional): The number of worker processes; with more than one, the
+                              windows are split between them. Defaults to 1.
 
     Returns:
         list of int: A list of medians, one for each sliding window.
 
+    Raises:
+        ValueError: If the sizes do not satisfy 1 <= k <= n <= len(arr), or if the engine
+                    is unknown.
+
     Description:
-        The function maintains a sorted window of size `k` using `SortedList`
-        from the `sortedcontainers` module.
-        It slides this window across the array, calculates the median for
-        each window, and appends it to the result list.
         The median for an odd-sized window is the middle element, while
         for an even-sized window, it is the smaller of the two middle elements.
     """
+    if not 1 <= k <= n <= len(arr):
+        raise ValueError("The sizes must satisfy 1 <= k <= n <= len(arr)")
+
+    if engine == "auto":
+        engine = select_engine(n, k)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {list(ENGINES)}")
+
+    if jobs > 1:
+        return parallel_sliding_median(n, k, arr, jobs, engine)
 
-    # This will store the elements in the current window in sorted order
-    window = SortedList()
+    # The pure Python engines are faster on a list than on NumPy scalars
+    arr = arr[:n]
+    if engine != "numpy" and isinstance(arr, np.ndarray):
+        arr = arr.tolist()
+    return ENGINES[engine](arr, k)
 
-    # List to store the medians of each window
-    medians = []
 
-    # First, fill the window with the first k elements from the array
-    for i in range(k):
-        window.add(arr[i])
+def quantile_rank(k: int, quantile: float) -> int:
+    """
+    Return the rank of a quantile in a sorted window of size `k`.
+
+    The rank is rounded down, so the 0.5 quantile is the median of `sliding_window_median`.
+    It is computed from the decimal form of the quantile, exactly: in floating point,
+    0.29 * 100 is 28.999999999999996, which would round down to the wrong rank.
 
-    # Now, process the remaining windows
-    for i in range(k, n):
-        # The median for the current window is the middle element of the sorted window
-        medians.append(window[k // 2])
+    Args:
+        k (int): The size of the window.
+        quantile (float): The quantile, between 0 and 1.
 
-        # Remove the element that is sliding out of the window
-        window.remove(arr[i - k])
+    Returns:
+        int: The 0-based rank of the quantile.
 
-        # Add the new element that is sliding into the window
-        window.add(arr[i])
+    Raises:
+        ValueError: If the quantile is outside [0, 1].
+    """
+    if not 0 <= quantile <= 1:
+        raise ValueError("Quantiles must be between 0 and 1")
+    return int(Fraction(str(quantile)) * (k - 1))
 
-    # After processing the last window, append the median for the final window
-    medians.append(window[k // 2])
 
-    # Return the list of medians
-    return medians
+def sliding_window_quantiles(
+    n: int, k: int, arr: Sequence[int], quantiles: Sequence[float]
+) -> List[Tuple[int, ...]]:
+    """
+    Calculate several quantiles (e.g. p50, p90 and p99) of each sliding window of size `k`
+    in the array `arr` in a single pass.
+
+    One order-statistic window is maintained for all quantiles, so each step costs one
+    insertion, one removal and one selection per quantile.
+
+    Args:
+        n (int): The size of the array.
+        k (int): The size of the sliding window.
+        arr (Sequence[int]): The integers of the array.
+        quantiles (Sequence[float]): The quantiles, between 0 and 1.
+
+    Returns:
+        List[Tuple[int, ...]]: For each sliding window, the values of the quantiles in the
+                               requested order.
+
+    Raises:
+        ValueError: If the sizes do not satisfy 1 <= k <= n <= len(arr), or if a quantile
+                    is outside [0, 1].
+    """
+    if not 1 <= k <= n <= len(arr):
+        raise ValueError("The sizes must satisfy 1 <= k <= n <= len(arr)")
+
+    ranks = [quantile_rank(k, quantile) for quantile in quantiles]
+    arr = arr[:n]
+    if isinstance(arr, np.ndarray):
+        arr = arr.tolist()
+    return sliding_order_statistics(arr, k, ranks)
+
+
+def sliding_window_cost(n: int, k: int, arr: Sequence[int]) -> List[int]:
+    """
+    Calculate, for each sliding window of size `k`, the sum of |x - median| over its
+    values, i.e. the cost of moving every value of the window to its median.
+
+    The window is the one of `SlidingMedian`, which keeps the running sums of its lower and
+    upper halves, so each step is O(log k) instead of O(k) for recomputing the deviations.
+
+    Args:
+        n (int): The size of the array.
+        k (int): The size of the sliding window.
+        arr (Sequence[int]): The integers of the array.
+
+    Returns:
+        List[int]: The cost of each sliding window.
+
+    Raises:
+        ValueError: If the sizes do not satisfy 1 <= k <= n <= len(arr).
+    """
+    if not 1 <= k <= n <= len(arr):
+        raise ValueError("The sizes must satisfy 1 <= k <= n <= len(arr)")
+
+    arr = arr[:n]
+    if isinstance(arr, np.ndarray):
+        arr = arr.tolist()
+
+    window = SlidingMedian(k)
+    costs = []
+    for x in arr:
+        window.push(x)
+        if window.count >= k:
+            costs.append(window.cost)
+
+    return costs
+
+
+def sliding_time_median(
+    events: Iterable[Tuple[float, int]], duration: float, tick: Optional[float] = None
+) -> List[Tuple[float, Optional[int]]]:
+    """
+    Calculate the median of the events of the last `duration` time units, for irregularly
+    timestamped events: at time t the window holds the events in (t - duration, t].
+
+    The window is evicted by time rather than by count, and each event costs O(log w) for
+    a window of w events (see `TimedSlidingMedian`).
+
+    Args:
+        events (Iterable[Tuple[float, int]]): The (timestamp, value) pairs, in
+            non-decreasing order of timestamp.
+        duration (float): The length of the window in time units.
+        tick (float, optional): The interval between reported medians, starting at the
+            first timestamp. Defaults to None, i.e. one median per event.
+
+    Returns:
+        List[Tuple[float, Optional[int]]]: The time and the median of the window at that
+                                           time, None if it holds no event.
+
+    Raises:
+        ValueError: If the events are not in order of timestamp, or if the duration or the
+                    tick is not positive.
+    """
+    return list(time_window_medians(events, duration, tick))
+
+
+def sliding_window_median_batch(
+    series: Sequence[Sequence[int]], k: int, method: str = "auto"
+) -> np.ndarray:
+    """
+    Calculate the sliding window medians of many equal-length series sharing a window size.
+
+    The series are stacked into a 2-D array and processed together, each step vectorized
+    across all of them instead of looping over the series (see `src.batch`).
+
+    Args:
+        series (Sequence[Sequence[int]]): The series, all of the same length n, e.g. the
+                                          rows of a (series, n) array.
+        k (int): The size of the sliding window.
+        method (str, optional): Either 'partition', 'fenwick', or 'auto' to select it from
+                                the window size. Defaults to 'auto'.
+
+    Returns:
+        np.ndarray: The (series, n - k + 1) array of medians, one row per series.
+
+    Raises:
+        ValueError: If the series are not of equal length, if the sizes do not satisfy
+                    1 <= k <= n, or if the method is unknown.
+    """
+    return batch_sliding_median(series, k, method)
 
 
 def load_data(path: str) -> List[Tuple[int, int, List[int]]]:
@@ -102,3 +271,79 @@ def load_data(path: str) -> List[Tuple[int, int, List[int]]]:
             examples.append((n, k, arr))
 
     return examples
+
+
+def iter_values(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[int]:
+    """
+    Lazily read the integers of a series file in chunks, so that series of several
+    gigabytes never have to be loaded at once.
+
+    Args:
+        path (str): The path to the file, with integers separated by commas, whitespace or
+                    line breaks.
+        chunk_size (int, optional): The number of characters read at once. Defaults to
+                                    `CHUNK_SIZE`.
+
+    Yields:
+        int: The integers of the series, in order.
+
+    Raises:
+        FileNotFoundError: If the file at the given path does not exist.
+        ValueError: If the file contains something else than integers.
+    """
+    rest = ""
+
+    with open(path, "r") as file:
+        while chunk := file.read(chunk_size):
+            tokens = (rest + chunk).replace(",", " ").split()
+
+            # The last token may continue in the next chunk
+            split = chunk[-1].isspace() or chunk[-1] == ","
+            rest = tokens.pop() if tokens and not split else ""
+            yield from map(int, tokens)
+
+    if rest:
+        yield int(rest)
+
+
+def load_arrays(path: str) -> List[Tuple[int, int, np.ndarray]]:
+    """
+    Reads the same layout as `load_data`, but parses each line of values in C with
+    `np.fromstring` instead of converting every value with `int`.
+
+    Args:
+        path (str): The path to the file containing the input data.
+
+    Returns:
+        List[Tuple[int, int, np.ndarray]]: A list of tuples, where each tuple contains:
+            - n (int): The size of the array.
+            - k (int): The window size.
+            - arr (np.ndarray): The int64 array of the case.
+
+    Raises:
+        ValueError: If the file is malformed, if a case line does not hold exactly n
+                    integers, or if the last case has no line of integers.
+    """
+    with open(path, "r") as file:
+        lines = [line for line in file.read().splitlines() if line.strip()]
+
+    if len(lines) % 2:
+        raise ValueError(f"Expected a line of integers after the line '{lines[-1]}'")
+
+    examples = []
+    for header, line in zip(lines[::2], lines[1::2]):
+        sizes = header.split(",")
+        if len(sizes) != 2:
+            raise ValueError(f"Expected a line 'n, k', got '{header}'")
+        n, k = map(int, sizes)
+
+        # Each case is parsed from its own line, so it cannot run into the next one; text
+        # that is not an integer stops the parse early and fails the length check
+        arr = np.fromstring(line, dtype=np.int64, sep=",")
+        if len(arr) != n:
+            raise ValueError(
+                f"Expected {n} integers after the line '{n}, {k}', got {len(arr)}"
+            )
+        examples.append((n, k, arr))
+
+    return examples